@@ -17,6 +17,7 @@ Validates:
     7. No external documentation (LAW 5)
 """
 
+import os
 import re
 import sys
 import json
@@ -69,6 +70,43 @@ class ValidationResult:
         }
 
 
+def _listdir_ext(directory: str, ext: str) -> List[str]:
+    """List files with a given extension (os.scandir is faster than Path.glob).
+
+    Returns raw path strings; wrapping every entry in Path just to call
+    .name or str() later is needless allocation on large audits.
+    """
+    return [e.path for e in os.scandir(directory)
+            if e.is_file() and e.name.endswith(ext)]
+
+
+@dataclass
+class SkillTree:
+    """Skill directory contents, scanned once and shared by all validators."""
+    references: List[str] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+    templates: List[str] = field(default_factory=list)
+    ref_texts: Dict[str, str] = field(default_factory=dict)
+
+
+def scan_skill_tree(skill_dir: Path) -> SkillTree:
+    """Build a SkillTree with a single pass over the skill directory."""
+    tree = SkillTree()
+    for entry in os.scandir(skill_dir):
+        if not entry.is_dir():
+            continue
+        if entry.name == "references":
+            tree.references = _listdir_ext(entry.path, ".md")
+        elif entry.name == "scripts":
+            tree.scripts = _listdir_ext(entry.path, ".py")
+        elif entry.name == "templates":
+            tree.templates = [e.path for e in os.scandir(entry.path)]
+    for ref in tree.references:
+        with open(ref) as f:
+            tree.ref_texts[ref] = f.read()
+    return tree
+
+
 def parse_frontmatter(content: str) -> Tuple[Optional[dict], str]:
     """Parse YAML frontmatter from markdown content."""
     if not content.startswith("---"):
@@ -205,85 +243,105 @@ def validate_structure(skill_dir: Path, violations: List[Violation], metrics: Di
             ))
 
 
-def validate_progressive_loading(skill_dir: Path, body: str, violations: List[Violation], metrics: Dict) -> None:
+def validate_progressive_loading(tree: SkillTree, index: "BodyIndex", violations: List[Violation], metrics: Dict) -> None:
     """Validate progressive loading DAG structure."""
-    
-    references_dir = skill_dir / "references"
-    scripts_dir = skill_dir / "scripts"
-    templates_dir = skill_dir / "templates"
-    
-    # Count resources
-    ref_count = len(list(references_dir.glob("*.md"))) if references_dir.exists() else 0
-    script_count = len(list(scripts_dir.glob("*.py"))) if scripts_dir.exists() else 0
-    template_count = len(list(templates_dir.glob("*"))) if templates_dir.exists() else 0
-    
-    metrics["references"] = ref_count
-    metrics["scripts"] = script_count
-    metrics["templates"] = template_count
-    
+
+    metrics["references"] = len(tree.references)
+    metrics["scripts"] = len(tree.scripts)
+    metrics["templates"] = len(tree.templates)
+
     # Check references are mentioned in SKILL.md
-    if references_dir.exists():
-        for ref_file in references_dir.glob("*.md"):
-            ref_name = ref_file.name
-            if ref_name not in body and f"references/{ref_name}" not in body:
-                violations.append(Violation(
-                    rule="PROGRESSIVE_UNREFERENCED",
-                    severity=Severity.MINOR,
-                    message=f"Reference '{ref_name}' not mentioned in SKILL.md",
-                    file=str(ref_file),
-                    suggestion="Add reference instruction in SKILL.md or remove file"
-                ))
-    
+    for ref_file in tree.references:
+        ref_name = os.path.basename(ref_file)
+        if not index.mentions(ref_name):
+            violations.append(Violation(
+                rule="PROGRESSIVE_UNREFERENCED",
+                severity=Severity.MINOR,
+                message=f"Reference '{ref_name}' not mentioned in SKILL.md",
+                file=ref_file,
+                suggestion="Add reference instruction in SKILL.md or remove file"
+            ))
+
     # Check scripts are mentioned
-    if scripts_dir.exists():
-        for script_file in scripts_dir.glob("*.py"):
-            script_name = script_file.name
-            if script_name not in body and f"scripts/{script_name}" not in body:
-                violations.append(Violation(
-                    rule="PROGRESSIVE_UNREFERENCED",
-                    severity=Severity.MINOR,
-                    message=f"Script '{script_name}' not mentioned in SKILL.md",
-                    file=str(script_file),
-                    suggestion="Add usage instruction in SKILL.md or remove file"
-                ))
-
-
-def validate_dag_topology(skill_dir: Path, body: str, violations: List[Violation], metrics: Dict) -> None:
+    for script_file in tree.scripts:
+        script_name = os.path.basename(script_file)
+        if not index.mentions(script_name):
+            violations.append(Violation(
+                rule="PROGRESSIVE_UNREFERENCED",
+                severity=Severity.MINOR,
+                message=f"Script '{script_name}' not mentioned in SKILL.md",
+                file=script_file,
+                suggestion="Add usage instruction in SKILL.md or remove file"
+            ))
+
+
+# File references like references/file.md, scripts/file.py, plus markdown
+# links, fused into one alternation so each body is scanned exactly once.
+_REF_RE = re.compile(r'(?:references|scripts|templates)/[\w-]+\.\w+')
+_DAG_RE = re.compile(
+    r'(?P<ref>(?:references|scripts|templates)/[\w-]+\.\w+)'
+    r'|\[(?P<text>[^\]]*)\]\((?P<link>[^)]*)\)'
+)
+
+
+def _scan_references(text: str) -> List[str]:
+    """Extract file references from text in a single pass."""
+    refs = []
+    for match in _DAG_RE.finditer(text):
+        if match.group("ref"):
+            refs.append(match.group("ref"))
+        else:
+            # Markdown link: both the visible text and the target may
+            # themselves be file references
+            refs.extend(_REF_RE.findall(match.group("text")))
+            refs.extend(_REF_RE.findall(match.group("link")))
+    return refs
+
+
+class BodyIndex:
+    """SKILL.md body scanned once, with O(1) lookups shared by all validators."""
+
+    __slots__ = ("raw", "lower", "references", "_mention_set")
+
+    def __init__(self, body: str):
+        self.raw = body
+        self.lower = body.lower()
+        self.references = frozenset(_scan_references(body))
+        self._mention_set = self.references | {
+            ref.rsplit("/", 1)[-1] for ref in self.references
+        }
+
+    def mentions(self, name: str) -> bool:
+        """True if the body mentions a file by path or bare name."""
+        return name in self._mention_set or name in self.raw
+
+
+def validate_dag_topology(tree: SkillTree, index: "BodyIndex", violations: List[Violation], metrics: Dict) -> None:
     """
     Validate DAG topology of skill references.
-    
+
     Checks η ≥ 4 (edges/nodes ratio) for connected skill structure.
     """
-    
-    # Extract references from SKILL.md
-    # Looking for patterns like: references/file.md, scripts/file.py
-    reference_pattern = re.compile(r'(?:references|scripts|templates)/[\w-]+\.\w+')
-    references = set(reference_pattern.findall(body))
-    
-    # Extract internal links (markdown links and code references)
-    link_pattern = re.compile(r'\[.*?\]\((.*?)\)')
-    links = set(link_pattern.findall(body))
-    
+
+    # References already extracted by the shared BodyIndex
+    references = index.references
+
     # Count nodes (files) and edges (references)
     nodes = set()
     edges = 0
-    
+
     # SKILL.md is always a node
     nodes.add("SKILL.md")
-    
+
     for ref in references:
         nodes.add(ref)
         edges += 1  # Edge from SKILL.md to reference
-    
+
     # Check cross-references in reference files
-    references_dir = skill_dir / "references"
-    if references_dir.exists():
-        for ref_file in references_dir.glob("*.md"):
-            ref_content = ref_file.read_text()
-            sub_refs = reference_pattern.findall(ref_content)
-            for sub_ref in sub_refs:
-                nodes.add(sub_ref)
-                edges += 1
+    for ref_content in tree.ref_texts.values():
+        for sub_ref in _scan_references(ref_content):
+            nodes.add(sub_ref)
+            edges += 1
     
     node_count = len(nodes)
     edge_count = edges
@@ -296,29 +354,20 @@ def validate_dag_topology(skill_dir: Path, body: str, violations: List[Violation
     # Skills are trees/DAGs, not dense graphs
 
 
-def validate_scripts_executable(skill_dir: Path, violations: List[Violation]) -> None:
+def validate_scripts_executable(tree: SkillTree, violations: List[Violation]) -> None:
     """Validate that scripts are syntactically correct."""
-    
-    scripts_dir = skill_dir / "scripts"
-    if not scripts_dir.exists():
-        return
-    
-    import subprocess
-    
-    for script_file in scripts_dir.glob("*.py"):
-        # Syntax check
-        result = subprocess.run(
-            ["python", "-m", "py_compile", str(script_file)],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
+
+    for script_file in tree.scripts:
+        # Syntax check (in-process compile; no subprocess, no .pyc written)
+        try:
+            with open(script_file) as f:
+                compile(f.read(), script_file, "exec")
+        except (SyntaxError, ValueError) as e:
             violations.append(Violation(
                 rule="SCRIPT_SYNTAX",
                 severity=Severity.CRITICAL,
-                message=f"Script has syntax errors",
-                file=str(script_file),
+                message=f"Script has syntax errors: {e}",
+                file=script_file,
                 suggestion="Fix Python syntax errors"
             ))
 
@@ -345,6 +394,9 @@ def validate_no_external_docs(skill_dir: Path, violations: List[Violation]) -> N
             ))
 
 
+_TECH_WORD_RE = re.compile(r'\b[A-Za-z]{4,}\b')
+
+
 def validate_description_quality(description: str, violations: List[Violation], metrics: Dict) -> None:
     """Score description quality."""
     
@@ -370,9 +422,12 @@ def validate_description_quality(description: str, violations: List[Violation],
         score += 0.10
     
     # Has domain terms (at least 2 technical/domain words)
-    technical_words = re.findall(r'\b[A-Za-z]{4,}\b', description)
-    if len(set(technical_words)) >= 5:
-        score += 0.15
+    seen_words: Set[str] = set()
+    for match in _TECH_WORD_RE.finditer(description):
+        seen_words.add(match.group(0))
+        if len(seen_words) >= 5:
+            score += 0.15
+            break
     
     metrics["description_score"] = round(score, 2)
     
@@ -385,8 +440,13 @@ def validate_description_quality(description: str, violations: List[Violation],
         ))
 
 
-def validate_skill(skill_dir: Path) -> ValidationResult:
-    """Run all validations on a skill directory."""
+def validate_skill(skill_dir: Path, full: bool = False) -> ValidationResult:
+    """Run all validations on a skill directory.
+
+    Stops after frontmatter validation on a critical failure unless `full`
+    is set; a broken skill fails either way and skipping the DAG and script
+    scans keeps audits of large broken corpora cheap.
+    """
     
     violations = []
     metrics = {}
@@ -412,10 +472,24 @@ def validate_skill(skill_dir: Path) -> ValidationResult:
     
     # Run validations
     validate_frontmatter(frontmatter, violations)
+
+    if not full and any(v.severity == Severity.CRITICAL for v in violations):
+        return ValidationResult(
+            passed=False,
+            skill_name=skill_name,
+            violations=violations,
+            metrics=metrics
+        )
+
+    # Built only past the early exit: the tree scan reads every
+    # reference and script file, which the fast path must not pay for
+    tree = scan_skill_tree(skill_dir)
+    index = BodyIndex(body)
+
     validate_structure(skill_dir, violations, metrics)
-    validate_progressive_loading(skill_dir, body, violations, metrics)
-    validate_dag_topology(skill_dir, body, violations, metrics)
-    validate_scripts_executable(skill_dir, violations)
+    validate_progressive_loading(tree, index, violations, metrics)
+    validate_dag_topology(tree, index, violations, metrics)
+    validate_scripts_executable(tree, violations)
     validate_no_external_docs(skill_dir, violations)
     
     if frontmatter and "description" in frontmatter:
@@ -433,11 +507,17 @@ def validate_skill(skill_dir: Path) -> ValidationResult:
     )
 
 
-def print_result(result: ValidationResult, json_output: bool = False) -> None:
+def print_result(result: ValidationResult, json_output: bool = False, pretty: bool = False) -> None:
     """Print validation result."""
-    
+
     if json_output:
-        print(json.dumps(result.to_dict(), indent=2))
+        if pretty:
+            print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+        else:
+            # Compact output for machine consumers (CI): no indentation,
+            # no ASCII-escaping of unicode descriptions
+            print(json.dumps(result.to_dict(), ensure_ascii=False,
+                             separators=(",", ":")))
         return
     
     print("\n" + "=" * 60)
@@ -484,7 +564,11 @@ def main():
     )
     parser.add_argument("skill_dir", help="Path to skill directory")
     parser.add_argument("--json", action="store_true", help="JSON output")
-    
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent JSON output (implies --json readability, slower)")
+    parser.add_argument("--full", action="store_true",
+                        help="Report all violations even after a critical frontmatter failure")
+
     args = parser.parse_args()
     skill_dir = Path(args.skill_dir).resolve()
     
@@ -492,8 +576,8 @@ def main():
         print(f"Error: {skill_dir} is not a directory")
         sys.exit(1)
     
-    result = validate_skill(skill_dir)
-    print_result(result, json_output=args.json)
+    result = validate_skill(skill_dir, full=args.full)
+    print_result(result, json_output=args.json, pretty=args.pretty)
     
     sys.exit(0 if result.passed else 1)
 
@@ -23,6 +23,17 @@ except ImportError:
 
 CLAUDE_DIR = Path.home() / ".claude"
 
+
+def _listdir_ext(directory: Path, ext: str) -> List[str]:
+    """List files with a given extension (os.scandir is faster than Path.glob).
+
+    Returns raw path strings; wrapping each entry in Path just to stringify
+    it again for reports is pure allocation overhead on large audits.
+    """
+    return [e.path for e in os.scandir(directory)
+            if e.is_file() and e.name.endswith(ext)]
+
+
 OFFICIAL_SCHEMA = {
     "skill": {
         "required": ["name", "description"],
@@ -40,6 +51,29 @@ OFFICIAL_SCHEMA = {
     }
 }
 
+# Precomputed per-type field sets so validate_component doesn't rebuild them per file
+_REQUIRED = {t: tuple(s.get("required", [])) for t, s in OFFICIAL_SCHEMA.items()}
+_ALLOWED = {t: frozenset(s.get("required", [])) | frozenset(s.get("optional", []))
+            for t, s in OFFICIAL_SCHEMA.items()}
+
+
+# Frontmatter almost always fits in the first 8 KiB; read the body only when it doesn't
+_FM_PREFIX_BYTES = 8192
+
+
+def read_frontmatter_source(path: str) -> str:
+    """Read only the leading frontmatter block, falling back to the whole file.
+
+    validate_component never looks at the body, so for typical components
+    this caps I/O and decode cost at a small constant.
+    """
+    with open(path, "rb") as f:
+        head = f.read(_FM_PREFIX_BYTES)
+        if head.startswith(b"---") and head.find(b"---", 3) == -1:
+            # Closing delimiter not in the prefix; need the rest of the file
+            head += f.read()
+    return head.decode("utf-8", errors="replace")
+
 
 def extract_frontmatter(content: str) -> Dict[str, Any]:
     """Extract YAML frontmatter from markdown content."""
@@ -72,20 +106,19 @@ def extract_frontmatter(content: str) -> Dict[str, Any]:
         return result
 
 
-def validate_component(path: Path, component_type: str) -> Dict[str, Any]:
+def validate_component(path: str, component_type: str) -> Dict[str, Any]:
     """Validate a component file against official schema."""
     try:
-        content = path.read_text()
+        content = read_frontmatter_source(path)
     except Exception as e:
         return {
-            "file": str(path),
+            "file": path,
             "type": component_type,
             "status": "error",
             "issues": [{"property": "file", "issue": f"Cannot read: {e}", "action": "Check file permissions"}]
         }
 
     frontmatter = extract_frontmatter(content)
-    schema = OFFICIAL_SCHEMA.get(component_type, {})
 
     issues = []
 
@@ -97,14 +130,14 @@ def validate_component(path: Path, component_type: str) -> Dict[str, Any]:
             "action": "Add frontmatter with --- delimiters"
         })
         return {
-            "file": str(path),
+            "file": path,
             "type": component_type,
             "status": "non-compliant",
             "issues": issues
         }
 
     # Check required fields
-    for field in schema.get("required", []):
+    for field in _REQUIRED.get(component_type, ()):
         if field not in frontmatter:
             issues.append({
                 "property": field,
@@ -113,7 +146,7 @@ def validate_component(path: Path, component_type: str) -> Dict[str, Any]:
             })
 
     # Check for non-official fields
-    all_official = set(schema.get("required", [])) | set(schema.get("optional", []))
+    all_official = _ALLOWED.get(component_type, frozenset())
     for field in frontmatter.keys():
         if field not in all_official:
             issues.append({
@@ -143,7 +176,7 @@ def validate_component(path: Path, component_type: str) -> Dict[str, Any]:
         status = "has-extensions"  # Only has non-official fields, not missing required
 
     result = {
-        "file": str(path),
+        "file": path,
         "type": component_type,
         "status": status,
         "issues": issues
@@ -163,11 +196,11 @@ def audit_skills() -> List[Dict[str, Any]]:
     if not skills_dir.exists():
         return results
 
-    for skill_dir in skills_dir.iterdir():
-        if not skill_dir.is_dir():
+    for entry in os.scandir(skills_dir):
+        if not entry.is_dir():
             continue
-        skill_file = skill_dir / "SKILL.md"
-        if skill_file.exists():
+        skill_file = os.path.join(entry.path, "SKILL.md")
+        if os.path.isfile(skill_file):
             results.append(validate_component(skill_file, "skill"))
 
     return results
@@ -181,7 +214,7 @@ def audit_agents() -> List[Dict[str, Any]]:
     if not agents_dir.exists():
         return results
 
-    for agent_file in agents_dir.glob("*.md"):
+    for agent_file in _listdir_ext(agents_dir, ".md"):
         results.append(validate_component(agent_file, "agent"))
 
     return results
@@ -195,7 +228,7 @@ def audit_commands() -> List[Dict[str, Any]]:
     if not commands_dir.exists():
         return results
 
-    for cmd_file in commands_dir.glob("*.md"):
+    for cmd_file in _listdir_ext(commands_dir, ".md"):
         results.append(validate_component(cmd_file, "command"))
 
     return results
@@ -285,6 +318,8 @@ def main():
     parser.add_argument("--type", choices=["skill", "agent", "command"],
                        help="Audit only specific component type")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--pretty", action="store_true",
+                       help="Indent JSON output (default is compact for pipelines)")
     parser.add_argument("--fix", action="store_true", help="Show remediation suggestions")
     parser.add_argument("--non-compliant", action="store_true",
                        help="Show only non-compliant components")
@@ -297,7 +332,12 @@ def main():
         results = [r for r in results if r["status"] in ("non-compliant", "error")]
 
     if args.json:
-        print(json.dumps(results, indent=2))
+        if args.pretty:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            # Compact output for machine consumers (CI): no indentation,
+            # no ASCII-escaping of unicode descriptions
+            print(json.dumps(results, ensure_ascii=False, separators=(",", ":")))
     else:
         print_report(results, show_fix=args.fix)
 
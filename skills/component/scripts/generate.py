@@ -10,6 +10,8 @@ Usage:
 """
 
 import argparse
+import string
+import sys
 from pathlib import Path
 
 TEMPLATES = {
@@ -95,74 +97,104 @@ keep-coding-instructions: true
 }
 
 
+# Optional-line variants derived from the base templates once, so the
+# render path picks a variant instead of interpolating empty strings
+TEMPLATES['command_with_hint'] = TEMPLATES['command'].replace(
+    '{extras}', 'argument-hint: [{argument_hint}]\n')
+TEMPLATES['command_plain'] = TEMPLATES['command'].replace('{extras}', '')
+TEMPLATES['agent_with_skills'] = TEMPLATES['agent'].replace(
+    '{skills_line}', 'skills: [{skills}]\n')
+TEMPLATES['agent_plain'] = TEMPLATES['agent'].replace('{skills_line}', '')
+
+# Templates pre-parsed into (literal, field) segments at import so batch
+# scaffolding runs don't re-parse the format string per component
+_PARSED = {k: [(literal, field)
+               for literal, field, _, _ in string.Formatter().parse(t)]
+           for k, t in TEMPLATES.items()}
+
+
+def fast_format(template: str, mapping: dict) -> str:
+    """Render a pre-parsed template by joining literals and field values."""
+    parts = []
+    for literal, field in _PARSED[template]:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(mapping[field]))
+    return ''.join(parts)
+
+
+# Directories already created this run; skips one mkdir syscall per file
+# during bulk scaffolding
+_ENSURED_DIRS = set()
+
+
+def _ensure_dir(directory: Path):
+    if directory in _ENSURED_DIRS:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    _ENSURED_DIRS.add(directory)
+
+
 def gen_command(args):
-    extras = ''
-    if args.argument_hint:
-        extras = f'argument-hint: [{args.argument_hint}]\n'
-    
-    content = TEMPLATES['command'].format(
+    template = 'command_with_hint' if args.argument_hint else 'command_plain'
+    content = fast_format(template, dict(
         description=args.description or f'Execute {args.name} operation',
         tools=args.tools or 'Read, Write, Agent',
         model=args.model or 'sonnet',
-        extras=extras,
+        argument_hint=args.argument_hint,
         title=args.name.replace('-', ' ').title(),
-    )
+    ))
     
     out = Path(args.output) / f'{args.name}.md'
-    out.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(out.parent)
     out.write_text(content)
     print(f"✓ Created: {out}")
 
 
 def gen_agent(args):
-    skills_line = f'skills: [{args.skills}]\n' if args.skills else ''
-    
-    content = TEMPLATES['agent'].format(
+    template = 'agent_with_skills' if args.skills else 'agent_plain'
+    content = fast_format(template, dict(
         description=args.description or f'{args.name.title()} specialist agent',
         tools=args.tools or 'Read, Write',
         model=args.model or 'sonnet',
         permission=args.permission or 'ask',
-        skills_line=skills_line,
+        skills=args.skills,
         title=args.name.replace('-', ' ').title(),
-    )
+    ))
     
     out = Path(args.output) / f'{args.name}.md'
-    out.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(out.parent)
     out.write_text(content)
     print(f"✓ Created: {out}")
 
 
 def gen_skill(args):
-    content = TEMPLATES['skill'].format(
+    content = fast_format('skill', dict(
         name=args.name,
         description=args.description or f'Procedures for {args.name} tasks. Trigger when working with {args.name}.',
         title=args.name.replace('-', ' ').title(),
-    )
+    ))
     
     skill_dir = Path(args.output) / args.name
-    skill_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(skill_dir)
     (skill_dir / 'SKILL.md').write_text(content)
     print(f"✓ Created: {skill_dir}/SKILL.md")
 
 
 def gen_style(args):
-    content = TEMPLATES['style'].format(
+    content = fast_format('style', dict(
         name=args.name,
         description=args.description or f'{args.name.title()} interaction mode',
         title=args.name.replace('-', ' ').title(),
-    )
+    ))
     
     out = Path(args.output) / f'{args.name}.md'
-    out.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(out.parent)
     out.write_text(content)
     print(f"✓ Created: {out}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Generate Claude Code components')
-    sub = parser.add_subparsers(dest='type', required=True)
-    
-    # Command
+def _add_command_parser(sub):
     p = sub.add_parser('command')
     p.add_argument('name')
     p.add_argument('-d', '--description')
@@ -170,8 +202,9 @@ def main():
     p.add_argument('-m', '--model', choices=['sonnet', 'opus', 'haiku'], default='sonnet')
     p.add_argument('-a', '--argument-hint')
     p.add_argument('-o', '--output', default='.claude/commands')
-    
-    # Agent
+
+
+def _add_agent_parser(sub):
     p = sub.add_parser('agent')
     p.add_argument('name')
     p.add_argument('-d', '--description')
@@ -180,22 +213,46 @@ def main():
     p.add_argument('-p', '--permission', choices=['ask', 'allow', 'deny'], default='ask')
     p.add_argument('-s', '--skills')
     p.add_argument('-o', '--output', default='.claude/agents')
-    
-    # Skill
+
+
+def _add_skill_parser(sub):
     p = sub.add_parser('skill')
     p.add_argument('name')
     p.add_argument('-d', '--description')
     p.add_argument('-o', '--output', default='.claude/skills')
-    
-    # Style
+
+
+def _add_style_parser(sub):
     p = sub.add_parser('style')
     p.add_argument('name')
     p.add_argument('-d', '--description')
     p.add_argument('-o', '--output', default='.claude/styles')
-    
+
+
+SUBCOMMANDS = {
+    'command': (_add_command_parser, gen_command),
+    'agent': (_add_agent_parser, gen_agent),
+    'skill': (_add_skill_parser, gen_skill),
+    'style': (_add_style_parser, gen_style),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate Claude Code components')
+    sub = parser.add_subparsers(dest='type', required=True)
+
+    # One subcommand runs per invocation, so register only the requested
+    # parser; fall back to all of them for help and error messages
+    requested = sys.argv[1] if len(sys.argv) > 1 else None
+    if requested in SUBCOMMANDS:
+        SUBCOMMANDS[requested][0](sub)
+    else:
+        for add_parser, _ in SUBCOMMANDS.values():
+            add_parser(sub)
+
     args = parser.parse_args()
-    
-    {'command': gen_command, 'agent': gen_agent, 'skill': gen_skill, 'style': gen_style}[args.type](args)
+
+    SUBCOMMANDS[args.type][1](args)
 
 
 if __name__ == '__main__':
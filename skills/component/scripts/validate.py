@@ -7,11 +7,22 @@ Usage:
     python validate.py <dir> --strict   # Fail on warnings
 """
 
+import os
 import sys
 import re
+import json
+import functools
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 
+import yaml
+
+try:
+    # libyaml C bindings: ~10-50x faster than the pure-Python loader
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Parameter compatibility matrix from SKILL.md
 PARAMS = {
     'command': {
@@ -36,82 +47,80 @@ PARAMS = {
     },
 }
 
+# Freeze the spec sets and precompute allowed|forbidden so the per-file
+# unknown-param check is one set difference instead of two
+for _spec in PARAMS.values():
+    _spec['allowed'] = frozenset(_spec['allowed'])
+    _spec['required'] = frozenset(_spec['required'])
+    _spec['forbidden'] = frozenset(_spec['forbidden'])
+    _spec['known'] = _spec['allowed'] | _spec['forbidden']
+
 VALID_MODELS = {'sonnet', 'opus', 'haiku'}
 VALID_PERMISSIONS = {'ask', 'allow', 'deny'}
 
+# Compiled once at import; validate_directory runs these per file
+_KEBAB_RE = re.compile(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$|^[a-z0-9]$')
+_ANGLE_RE = re.compile(r'[<>]')
+
 
-def extract_frontmatter(content: str) -> Optional[str]:
-    """Extract YAML frontmatter."""
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    return match.group(1) if match else None
+def read_frontmatter(filepath: Path) -> Optional[str]:
+    """Read only the leading frontmatter block, not the whole file.
+
+    Stops at the closing --- so bytes read stay O(frontmatter size)
+    regardless of how long the markdown body is.
+    """
+    with filepath.open('r', encoding='utf-8') as f:
+        # Bounded read: a file with no frontmatter (even one long
+        # unterminated line) costs a few bytes, not the whole file
+        if f.readline(8) != '---\n':
+            return None
+        lines = []
+        for line in f:
+            if line.startswith('---'):
+                return ''.join(lines).rstrip('\n')
+            lines.append(line)
+    return None  # never closed
 
 
 def parse_yaml(yaml_str: str) -> Dict[str, any]:
-    """Simple YAML parser (no deps)."""
-    result = {}
-    current_key = None
-    current_value = []
-    in_array = False
-    
-    for line in yaml_str.split('\n'):
-        stripped = line.strip()
-        if not stripped or stripped.startswith('#'):
-            continue
-        
-        key_match = re.match(r'^([\w-]+)\s*:\s*(.*)', line)
-        if key_match and not line.startswith(' '):
-            if current_key:
-                val = current_value if in_array else '\n'.join(current_value).strip()
-                result[current_key] = val
-            
-            current_key = key_match.group(1)
-            value = key_match.group(2).strip()
-            
-            if value.startswith('[') and value.endswith(']'):
-                items = value[1:-1].split(',')
-                current_value = [i.strip() for i in items if i.strip()]
-                in_array = True
-            elif value == '' or value == '[]':
-                current_value = []
-                in_array = True
-            else:
-                current_value = [value]
-                in_array = False
-        elif stripped.startswith('- ') and current_key:
-            current_value.append(stripped[2:])
-            in_array = True
-    
-    if current_key:
-        val = current_value if in_array else '\n'.join(current_value).strip()
-        result[current_key] = val
-    
-    return result
+    """Parse frontmatter YAML with the C-backed loader."""
+    try:
+        data = yaml.load(yaml_str, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        return {}
+    return data if isinstance(data, dict) else {}
 
 
-def detect_type(filepath: Path) -> Optional[str]:
-    """Detect component type from path."""
-    path_str = str(filepath).lower()
-    if '/commands/' in path_str:
+@functools.lru_cache(maxsize=4096)
+def _detect_parent(parent: str, is_skill_md: bool) -> Optional[str]:
+    """Classify a parent directory; cached since siblings share parents."""
+    if '/commands/' in parent:
         return 'command'
-    if '/agents/' in path_str:
+    if '/agents/' in parent:
         return 'agent'
-    if '/skills/' in path_str and filepath.name.upper() == 'SKILL.MD':
+    if '/skills/' in parent and is_skill_md:
         return 'skill'
-    if '/styles/' in path_str:
+    if '/styles/' in parent:
         return 'style'
     return None
 
 
+def detect_type(filepath: Path) -> Optional[str]:
+    """Detect component type from path."""
+    # Trailing slash so '/commands/' also matches the final path component
+    parent = str(filepath.parent).lower() + '/'
+    return _detect_parent(parent, filepath.name.upper() == 'SKILL.MD')
+
+
 def validate(filepath: Path, comp_type: str) -> Tuple[List[str], List[str]]:
     """Validate component. Returns (errors, warnings)."""
     errors, warnings = [], []
     
     try:
-        content = filepath.read_text()
+        fm = read_frontmatter(filepath)
     except Exception as e:
         return [f"Cannot read: {e}"], []
-    
-    fm = extract_frontmatter(content)
+
     if not fm:
         return ["No YAML frontmatter"], []
     
@@ -130,79 +139,165 @@ def validate(filepath: Path, comp_type: str) -> Tuple[List[str], List[str]]:
         errors.append(f"Forbidden for {comp_type}: {', '.join(forbidden)}")
     
     # Unknown
-    unknown = param_keys - spec['allowed'] - spec['forbidden']
+    unknown = param_keys - spec['known']
     if unknown:
         warnings.append(f"Unknown params: {', '.join(unknown)}")
     
     # Validate model
     if 'model' in params:
-        model = params['model'].lower() if isinstance(params['model'], str) else str(params['model'][0]).lower()
+        model = str(params['model']).lower()
         if model not in VALID_MODELS:
             errors.append(f"Invalid model '{model}'. Use: {VALID_MODELS}")
-    
+
     # Validate permissionMode
     if 'permissionMode' in params:
-        mode = params['permissionMode'].lower() if isinstance(params['permissionMode'], str) else str(params['permissionMode'][0]).lower()
+        mode = str(params['permissionMode']).lower()
         if mode not in VALID_PERMISSIONS:
             errors.append(f"Invalid permissionMode '{mode}'. Use: {VALID_PERMISSIONS}")
-    
-    # Validate booleans
+
+    # Validate booleans (YAML parses bare true/false natively)
     for field in ['disable-model-invocation', 'keep-coding-instructions']:
-        if field in params:
-            val = params[field].lower() if isinstance(params[field], str) else str(params[field][0]).lower()
-            if val not in ('true', 'false'):
-                errors.append(f"'{field}' must be true/false")
-    
+        if field in params and not isinstance(params[field], bool):
+            errors.append(f"'{field}' must be true/false")
+
     # Skill-specific: name format
     if comp_type == 'skill' and 'name' in params:
-        name = params['name'] if isinstance(params['name'], str) else params['name'][0]
-        if not re.match(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$|^[a-z0-9]$', name):
+        name = str(params['name'])
+        if not _KEBAB_RE.match(name):
             errors.append(f"Skill name '{name}' must be kebab-case")
         if '--' in name:
             errors.append(f"Skill name cannot have consecutive hyphens")
         if len(name) > 64:
             errors.append(f"Skill name too long ({len(name)} > 64)")
-    
+
     # Skill-specific: description length
     if comp_type == 'skill' and 'description' in params:
-        desc = params['description'] if isinstance(params['description'], str) else ' '.join(params['description'])
+        desc = str(params['description'])
         if len(desc) > 1024:
             errors.append(f"Description too long ({len(desc)} > 1024)")
-        if '<' in desc or '>' in desc:
+        if _ANGLE_RE.search(desc):
             errors.append("Description cannot contain angle brackets")
     
     return errors, warnings
 
 
+CACHE_PATH = Path.home() / '.claude' / '.validate-cache.json'
+
+
+def load_result_cache() -> Dict[str, dict]:
+    """Load cached validation results keyed by file path."""
+    try:
+        return json.loads(CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_result_cache(cache: Dict[str, dict]) -> None:
+    """Persist validation results; best-effort, never fails the run.
+
+    Written to a temp file and renamed so a concurrent or interrupted run
+    can never leave a torn file behind (which would discard the cache).
+    """
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_PATH.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(cache))
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _validate_one(job: Tuple[str, str]) -> Tuple[List[str], List[str]]:
+    """Validate a single (path, type) job; module-scope so it pickles."""
+    filepath, comp_type = job
+    return validate(Path(filepath), comp_type)
+
+
+def collect_jobs(root: Path) -> List[Tuple[str, str]]:
+    """Find all components under root with a single tree walk.
+
+    One os.walk pass classifying each .md by its parent directory replaces
+    four recursive glob patterns that each re-walked the whole tree.
+    """
+    by_type = {'command': [], 'agent': [], 'skill': [], 'style': []}
+    for dirpath, dirs, files in os.walk(root):
+        parent = os.path.basename(dirpath)
+        if parent == 'commands':
+            comp_type = 'command'
+        elif parent == 'agents':
+            comp_type = 'agent'
+        elif parent == 'styles':
+            comp_type = 'style'
+        elif os.path.basename(os.path.dirname(dirpath)) == 'skills':
+            if 'SKILL.md' in files:
+                by_type['skill'].append(os.path.join(dirpath, 'SKILL.md'))
+            continue
+        else:
+            continue
+        for f in files:
+            if f.endswith('.md'):
+                by_type[comp_type].append(os.path.join(dirpath, f))
+    return [(filepath, comp_type)
+            for comp_type in ('command', 'agent', 'skill', 'style')
+            for filepath in sorted(by_type[comp_type])]
+
+
 def validate_directory(root: Path, strict: bool = False) -> int:
     """Validate all components in directory. Returns exit code."""
-    patterns = [
-        ('**/commands/*.md', 'command'),
-        ('**/agents/*.md', 'agent'),
-        ('**/skills/*/SKILL.md', 'skill'),
-        ('**/styles/*.md', 'style'),
-    ]
-    
     total_errors = 0
     total_warnings = 0
-    
-    for pattern, comp_type in patterns:
-        for filepath in root.glob(pattern):
-            errors, warnings = validate(filepath, comp_type)
-            
-            if errors:
-                print(f"❌ {filepath}")
-                for e in errors:
-                    print(f"   ERROR: {e}")
-                total_errors += len(errors)
-            elif warnings:
-                print(f"⚠️  {filepath}")
-                for w in warnings:
-                    print(f"   WARN: {w}")
-                total_warnings += len(warnings)
-            else:
-                print(f"✓ {filepath}")
-    
+
+    cache = load_result_cache()
+
+    # Collect jobs first: validation is per-file independent, so uncached
+    # files fan out across a process pool while hits come from the cache
+    jobs = collect_jobs(root)
+
+    results: Dict[int, Tuple[List[str], List[str]]] = {}
+    pending = []  # (job index, key, sig)
+
+    for idx, (filepath, comp_type) in enumerate(jobs):
+        key = filepath
+        try:
+            st = os.stat(filepath)
+            sig = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            sig = None
+        cached = cache.get(key)
+        if sig is not None and cached and cached.get('sig') == sig:
+            results[idx] = (cached['errors'], cached['warnings'])
+        else:
+            pending.append((idx, key, sig))
+
+    if pending:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor() as ex:
+            outcomes = ex.map(_validate_one,
+                              [jobs[idx] for idx, _, _ in pending],
+                              chunksize=32)
+            for (idx, key, sig), (errors, warnings) in zip(pending, outcomes):
+                results[idx] = (errors, warnings)
+                if sig is not None:
+                    cache[key] = {'sig': sig, 'errors': errors, 'warnings': warnings}
+
+    # Report in collection order so output stays deterministic
+    for idx, (filepath, comp_type) in enumerate(jobs):
+        errors, warnings = results[idx]
+        if errors:
+            print(f"❌ {filepath}")
+            for e in errors:
+                print(f"   ERROR: {e}")
+            total_errors += len(errors)
+        elif warnings:
+            print(f"⚠️  {filepath}")
+            for w in warnings:
+                print(f"   WARN: {w}")
+            total_warnings += len(warnings)
+        else:
+            print(f"✓ {filepath}")
+
+    save_result_cache(cache)
+
     print(f"\n{total_errors} errors, {total_warnings} warnings")
     
     if total_errors > 0:
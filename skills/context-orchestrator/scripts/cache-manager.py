@@ -4,18 +4,35 @@ Context Orchestrator Cache Manager
 
 Manages session-based caching for context extraction results.
 Supports TTL-based expiration and cache operations.
+
+Entries live in a SQLite table so get/set are indexed point operations
+instead of deserializing the whole cache file on every call.
 """
 
 import json
 import hashlib
 import os
+import sqlite3
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, Any, Dict
 
+try:
+    # Rust-backed serializer, ~5-10x faster than stdlib json for payloads
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 CACHE_DIR = Path.home() / ".claude" / ".context-cache"
-CACHE_FILE = CACHE_DIR / "session-context.json"
+CACHE_DB = CACHE_DIR / "cache.db"
 
 # TTL configuration (in minutes)
 TTL_CONFIG = {
@@ -25,7 +42,23 @@ TTL_CONFIG = {
 }
 
 MAX_ENTRIES = 50
-MAX_CACHE_SIZE_MB = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    source TEXT,
+    query TEXT,
+    result TEXT,
+    cached_at REAL,
+    ttl_minutes INTEGER,
+    last_used REAL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
 
 
 def ensure_cache_dir():
@@ -33,146 +66,160 @@ def ensure_cache_dir():
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_cache() -> Dict:
-    """Load cache from disk."""
+def connect() -> sqlite3.Connection:
+    """Open the cache database, creating the schema if needed."""
     ensure_cache_dir()
-    if CACHE_FILE.exists():
-        try:
-            with open(CACHE_FILE, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return create_empty_cache()
-    return create_empty_cache()
-
-
-def save_cache(cache: Dict):
-    """Save cache to disk."""
-    ensure_cache_dir()
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f, indent=2, default=str)
-
-
-def create_empty_cache() -> Dict:
-    """Create a new empty cache structure."""
-    return {
-        "session_id": hashlib.md5(str(datetime.now()).encode()).hexdigest()[:12],
-        "created_at": datetime.now().isoformat(),
-        "sources": {
-            "limitless": True,
-            "research": True,
-            "pieces": True,
-        },
-        "entries": {},
-    }
+    conn = sqlite3.connect(CACHE_DB)
+    # Concurrent CLI invocations: wait for the other writer instead of
+    # failing with "database is locked"
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.executescript(_SCHEMA)
+    try:
+        # Databases created before the LRU column existed
+        conn.execute("ALTER TABLE entries ADD COLUMN last_used REAL")
+    except sqlite3.OperationalError:
+        pass
+    return conn
+
+
+def init_session(conn: sqlite3.Connection) -> str:
+    """Start a new session: clear entries and mint a session id."""
+    session_id = hashlib.blake2b(str(datetime.now()).encode(),
+                                 digest_size=6).hexdigest()
+    with conn:
+        conn.execute("DELETE FROM entries")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('session_id', ?)",
+            (session_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES('created_at', ?)",
+            (str(time.time()),))
+    return session_id
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """Read a session metadata value."""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
 
 
 def generate_key(source: str, query: str) -> str:
-    """Generate cache key from source and query."""
-    query_hash = hashlib.md5(query.lower().strip().encode()).hexdigest()[:8]
-    return f"{source}:{query_hash}"
+    """Generate cache key from source and query.
 
-
-def is_expired(entry: Dict) -> bool:
-    """Check if cache entry is expired."""
-    if "cached_at" not in entry or "ttl_minutes" not in entry:
-        return True
-
-    cached_at = datetime.fromisoformat(entry["cached_at"])
-    ttl = timedelta(minutes=entry["ttl_minutes"])
-    return datetime.now() > cached_at + ttl
+    blake2b is faster than md5 on short inputs and skips its crypto
+    baggage; digest_size=4 yields the same 8 hex chars as the old key.
+    """
+    query_hash = hashlib.blake2b(query.lower().strip().encode(),
+                                 digest_size=4).hexdigest()
+    return f"{source}:{query_hash}"
 
 
 def get_cache(source: str, query: str) -> Optional[Any]:
     """Get cached result if available and not expired."""
-    cache = load_cache()
+    conn = connect()
     key = generate_key(source, query)
-
-    if key in cache["entries"]:
-        entry = cache["entries"][key]
-        if not is_expired(entry):
-            return entry.get("result")
-        else:
-            # Clean up expired entry
-            del cache["entries"][key]
-            save_cache(cache)
-
-    return None
+    try:
+        row = conn.execute(
+            "SELECT result, cached_at, ttl_minutes FROM entries WHERE key = ?",
+            (key,)).fetchone()
+        if row is None:
+            return None
+        result, cached_at, ttl_minutes = row
+        if time.time() > cached_at + ttl_minutes * 60:
+            # Stale: leave it for set_cache eviction / cleanup_expired
+            return None
+        # Move-to-end for true LRU: a single indexed row update,
+        # not a full cache rewrite
+        with conn:
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?",
+                         (time.time(), key))
+        return _loads(result)
+    finally:
+        conn.close()
 
 
 def set_cache(source: str, query: str, result: Any):
     """Store result in cache."""
-    cache = load_cache()
-    key = generate_key(source, query)
-
-    # Enforce max entries (LRU-style: remove oldest)
-    if len(cache["entries"]) >= MAX_ENTRIES:
-        oldest_key = min(
-            cache["entries"].keys(),
-            key=lambda k: cache["entries"][k].get("cached_at", "")
-        )
-        del cache["entries"][oldest_key]
-
-    cache["entries"][key] = {
-        "source": source,
-        "query": query,
-        "result": result,
-        "cached_at": datetime.now().isoformat(),
-        "ttl_minutes": TTL_CONFIG.get(source, 30),
-    }
-
-    save_cache(cache)
+    conn = connect()
+    try:
+        with conn:
+            # Enforce max entries (LRU-style: remove oldest)
+            (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            if count >= MAX_ENTRIES:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries "
+                    "ORDER BY COALESCE(last_used, cached_at) LIMIT ?)",
+                    (count - MAX_ENTRIES + 1,))
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries"
+                "(key, source, query, result, cached_at, ttl_minutes, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (generate_key(source, query), source, query,
+                 _dumps(result), now,
+                 TTL_CONFIG.get(source, 30), now))
+    finally:
+        conn.close()
 
 
 def clear_cache(source: Optional[str] = None):
     """Clear cache entries. If source specified, only clear that source."""
-    cache = load_cache()
-
-    if source:
-        cache["entries"] = {
-            k: v for k, v in cache["entries"].items()
-            if not k.startswith(f"{source}:")
-        }
-    else:
-        cache["entries"] = {}
-
-    save_cache(cache)
+    conn = connect()
+    try:
+        with conn:
+            if source:
+                conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+            else:
+                conn.execute("DELETE FROM entries")
+    finally:
+        conn.close()
 
 
 def cleanup_expired():
     """Remove all expired entries."""
-    cache = load_cache()
-    cache["entries"] = {
-        k: v for k, v in cache["entries"].items()
-        if not is_expired(v)
-    }
-    save_cache(cache)
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "DELETE FROM entries WHERE cached_at + ttl_minutes * 60 < ?",
+                (time.time(),))
+    finally:
+        conn.close()
 
 
 def get_stats() -> Dict:
     """Get cache statistics."""
-    cache = load_cache()
-    entries = cache.get("entries", {})
-
-    by_source = {"limitless": 0, "research": 0, "pieces": 0}
-    expired_count = 0
-
-    for entry in entries.values():
-        source = entry.get("source", "unknown")
-        if source in by_source:
-            by_source[source] += 1
-        if is_expired(entry):
-            expired_count += 1
-
-    cache_size = CACHE_FILE.stat().st_size if CACHE_FILE.exists() else 0
-
-    return {
-        "session_id": cache.get("session_id"),
-        "created_at": cache.get("created_at"),
-        "total_entries": len(entries),
-        "by_source": by_source,
-        "expired_entries": expired_count,
-        "cache_size_kb": round(cache_size / 1024, 2),
-    }
+    conn = connect()
+    try:
+        by_source = {"limitless": 0, "research": 0, "pieces": 0}
+        total = 0
+        for src, count in conn.execute(
+                "SELECT source, COUNT(*) FROM entries GROUP BY source"):
+            total += count
+            if src in by_source:
+                by_source[src] = count
+
+        (expired_count,) = conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE cached_at + ttl_minutes * 60 < ?",
+            (time.time(),)).fetchone()
+
+        created_at = get_meta(conn, "created_at")
+        try:
+            cache_size = CACHE_DB.stat().st_size
+        except FileNotFoundError:
+            cache_size = 0
+
+        return {
+            "session_id": get_meta(conn, "session_id"),
+            "created_at": float(created_at) if created_at else None,
+            "total_entries": total,
+            "by_source": by_source,
+            "expired_entries": expired_count,
+            "cache_size_kb": round(cache_size / 1024, 2),
+        }
+    finally:
+        conn.close()
 
 
 def main():
@@ -185,9 +232,12 @@ def main():
     command = sys.argv[1]
 
     if command == "init":
-        cache = create_empty_cache()
-        save_cache(cache)
-        print(json.dumps({"status": "initialized", "session_id": cache["session_id"]}))
+        conn = connect()
+        try:
+            session_id = init_session(conn)
+        finally:
+            conn.close()
+        print(json.dumps({"status": "initialized", "session_id": session_id}))
 
     elif command == "get":
         if len(sys.argv) < 4:
@@ -6,8 +6,13 @@ Logs context extractions for future reference, pattern analysis, and debugging.
 Maintains a searchable history of what context was retrieved and when.
 """
 
+import atexit
+import base64
+import csv
+import functools
+import io
 import json
-import hashlib
+import mmap
 import os
 import sys
 from datetime import datetime, timedelta
@@ -15,14 +20,44 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import re
 
+try:
+    # Linear-time DFA engine; the tag patterns below are simple word
+    # alternations it handles without backtracking
+    import re2 as _re_engine
+except ImportError:
+    try:
+        # Faster drop-in than stdlib re where available
+        import regex as _re_engine
+    except ImportError:
+        _re_engine = re
+
+try:
+    # Rust-backed serializer, ~5-10x faster than stdlib json for payloads
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 HISTORY_DIR = Path.home() / ".claude" / ".context-cache" / "history"
 HISTORY_FILE = HISTORY_DIR / "extractions.jsonl"
 INDEX_FILE = HISTORY_DIR / "index.json"
 
+# Append-only sidecars for the ever-growing lookup lists; one tab-separated
+# row per append instead of rewriting them inside the JSON index
+ENTRIES_TSV = HISTORY_DIR / "entries.tsv"
+SOURCE_TSV = HISTORY_DIR / "by_source.tsv"
+TAG_TSV = HISTORY_DIR / "by_tag.tsv"
+
 # Configuration
 MAX_ENTRIES = 500
 MAX_AGE_DAYS = 90
 MAX_CONTENT_LENGTH = 5000  # Truncate long content
+TRIM_SLACK = 50  # appends allowed past MAX_ENTRIES before trimming
 
 
 def ensure_history_dir():
@@ -30,9 +65,82 @@ def ensure_history_dir():
     HISTORY_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Kept open across log calls so each append is one buffered write
+# instead of an open/write/close syscall triplet
+_LOG_FH = None
+
+# Index mutations accumulate in memory and flush every N appends (and at
+# exit) instead of rewriting the index JSON on every log call
+_INDEX_CACHE = None
+_INDEX_DIRTY = 0
+INDEX_FLUSH_EVERY = 20
+
+
+def _get_log_fh():
+    global _LOG_FH
+    if _LOG_FH is None:
+        ensure_history_dir()
+        _LOG_FH = open(HISTORY_FILE, "ab", buffering=64 * 1024)
+        atexit.register(_close_log_fh)
+    return _LOG_FH
+
+
+def _close_log_fh():
+    global _LOG_FH
+    if _LOG_FH is not None:
+        _LOG_FH.close()
+        _LOG_FH = None
+
+
+# Buffered append handles for the TSV sidecars, opened on first use
+_TSV_FHS = {}
+
+
+def _get_tsv_fh(path: Path):
+    if not _TSV_FHS:
+        atexit.register(_close_tsv_fhs)
+    fh = _TSV_FHS.get(path)
+    if fh is None:
+        ensure_history_dir()
+        fh = _TSV_FHS[path] = open(path, "a", buffering=64 * 1024)
+    return fh
+
+
+def _close_tsv_fhs():
+    while _TSV_FHS:
+        _, fh = _TSV_FHS.popitem()
+        fh.close()
+
+
+def _load_index() -> Dict:
+    global _INDEX_CACHE
+    if _INDEX_CACHE is None:
+        _INDEX_CACHE = {"updated_at": None}
+        if INDEX_FILE.exists():
+            try:
+                _INDEX_CACHE = _loads(INDEX_FILE.read_text())
+            except json.JSONDecodeError:
+                pass
+        atexit.register(_flush_index)
+    return _INDEX_CACHE
+
+
+def _flush_index():
+    global _INDEX_DIRTY
+    if _INDEX_CACHE is not None and _INDEX_DIRTY:
+        ensure_history_dir()
+        # Compact separators: only this script reads the index back
+        INDEX_FILE.write_text(json.dumps(_INDEX_CACHE, separators=(",", ":")))
+        _INDEX_DIRTY = 0
+
+
 def generate_id() -> str:
-    """Generate unique extraction ID."""
-    return hashlib.md5(f"{datetime.now().isoformat()}{os.urandom(8).hex()}".encode()).hexdigest()[:12]
+    """Generate unique extraction ID.
+
+    64 bits of os.urandom base32-encoded: same 12-char shape as the old
+    truncated md5 without paying for a hash round per log call.
+    """
+    return base64.b32encode(os.urandom(8)).decode('ascii').rstrip('=').lower()[:12]
 
 
 def log_extraction(
@@ -58,14 +166,18 @@ def log_extraction(
     ensure_history_dir()
 
     # Truncate long results
-    result_str = json.dumps(result) if isinstance(result, (dict, list)) else str(result)
+    result_str = _dumps(result) if isinstance(result, (dict, list)) else str(result)
     if len(result_str) > MAX_CONTENT_LENGTH:
         result_str = result_str[:MAX_CONTENT_LENGTH] + "... [truncated]"
         result = {"truncated": True, "preview": result_str}
 
+    # One clock read per log call; the ISO string and epoch stay in sync
+    now = datetime.now()
+
     entry = {
         "id": generate_id(),
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
+        "ts_epoch": now.timestamp(),
         "source": source,
         "query": query,
         "command": command,
@@ -74,90 +186,232 @@ def log_extraction(
         "tags": _extract_tags(query, source),
     }
 
-    # Append to JSONL
-    with open(HISTORY_FILE, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    # Append to JSONL; flushed so retention sees a complete file
+    fh = _get_log_fh()
+    line = (_dumps(entry) + "\n").encode("utf-8")
+    offset = fh.tell()
+    fh.write(line)
+    fh.flush()
 
     # Update index
-    _update_index(entry)
+    _update_index(entry, offset, len(line))
 
     # Enforce retention
     _enforce_retention()
 
+    get_entry.cache_clear()
+
     return entry
 
 
+# Domain tag patterns compiled once at import; _extract_tags runs per log
+# call. Tag names are interned so every entry shares one string object and
+# membership tests can short-circuit on pointer equality.
+_TAG_PATTERNS = [
+    (_re_engine.compile(pattern, _re_engine.I), sys.intern(tag))
+    for pattern, tag in [
+        (r'\b(auth|login|session)\b', "authentication"),
+        (r'\b(api|endpoint|rest)\b', "api"),
+        (r'\b(db|database|sql)\b', "database"),
+        (r'\b(test|testing|spec)\b', "testing"),
+        (r'\b(error|bug|fix)\b', "debugging"),
+        (r'\b(meeting|call|discussion)\b', "meeting"),
+        (r'\b(doc|documentation|guide)\b', "documentation"),
+    ]
+]
+
+
 def _extract_tags(query: str, source: str) -> List[str]:
     """Extract tags from query for indexing."""
-    tags = [source]
-
-    # Add domain tags based on patterns
-    if re.search(r'\b(auth|login|session)\b', query, re.I):
-        tags.append("authentication")
-    if re.search(r'\b(api|endpoint|rest)\b', query, re.I):
-        tags.append("api")
-    if re.search(r'\b(db|database|sql)\b', query, re.I):
-        tags.append("database")
-    if re.search(r'\b(test|testing|spec)\b', query, re.I):
-        tags.append("testing")
-    if re.search(r'\b(error|bug|fix)\b', query, re.I):
-        tags.append("debugging")
-    if re.search(r'\b(meeting|call|discussion)\b', query, re.I):
-        tags.append("meeting")
-    if re.search(r'\b(doc|documentation|guide)\b', query, re.I):
-        tags.append("documentation")
+    tags = [sys.intern(source)]
+
+    for pattern, tag in _TAG_PATTERNS:
+        if pattern.search(query):
+            tags.append(tag)
 
     return tags
 
 
-def _update_index(entry: Dict):
-    """Update the search index with new entry."""
-    ensure_history_dir()
+def _update_index(entry: Dict, offset: int, length: int):
+    """Update the search index with new entry.
 
-    index = {"entries": [], "by_source": {}, "by_tag": {}, "updated_at": None}
-    if INDEX_FILE.exists():
-        try:
-            index = json.loads(INDEX_FILE.read_text())
-        except json.JSONDecodeError:
-            pass
-
-    # Add to entries list (just IDs for lookup)
-    index["entries"].append({
-        "id": entry["id"],
-        "timestamp": entry["timestamp"],
-        "source": entry["source"],
-        "query_preview": entry["query"][:100],
-    })
-
-    # Index by source
-    source = entry["source"]
-    if source not in index["by_source"]:
-        index["by_source"][source] = []
-    index["by_source"][source].append(entry["id"])
-
-    # Index by tags
+    The per-append lookup rows (entry preview, source, tags) go to
+    append-only TSV sidecars, so writing them is O(1) per log call; only
+    the bounded id2off map and counters stay in the rewritten JSON index.
+    """
+    global _INDEX_DIRTY
+    index = _load_index()
+
+    # Byte offset map so get_entry is one seek+read, not a full scan
+    index.setdefault("id2off", {})[entry["id"]] = [offset, length]
+
+    # Running line count so retention never has to scan the file to
+    # decide whether a trim is due
+    index["line_count"] = index.get("line_count", 0) + 1
+
+    index["updated_at"] = entry["timestamp"]
+
+    eid = entry["id"]
+    preview = entry["query"][:100].replace("\t", " ").replace("\n", " ")
+    _get_tsv_fh(ENTRIES_TSV).write(
+        f"{eid}\t{entry['timestamp']}\t{entry['source']}\t{preview}\n")
+    _get_tsv_fh(SOURCE_TSV).write(f"{entry['source']}\t{eid}\n")
+    tag_fh = _get_tsv_fh(TAG_TSV)
     for tag in entry.get("tags", []):
-        if tag not in index["by_tag"]:
-            index["by_tag"][tag] = []
-        index["by_tag"][tag].append(entry["id"])
+        tag_fh.write(f"{tag}\t{eid}\n")
 
-    index["updated_at"] = datetime.now().isoformat()
+    _INDEX_DIRTY += 1
+    if _INDEX_DIRTY >= INDEX_FLUSH_EVERY:
+        _flush_index()
 
-    INDEX_FILE.write_text(json.dumps(index, indent=2))
+
+def _tail_offset(path: Path, keep: int, blocksize: int = 64 * 1024) -> Optional[int]:
+    """Byte offset where the last `keep` lines of a file start.
+
+    Scans blocks backwards from EOF, so the cost is bounded by the kept
+    tail rather than the whole file. Returns None when the file holds
+    `keep` lines or fewer.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        if pos == 0:
+            return None
+        # The trailing newline does not start a new line
+        f.seek(pos - 1)
+        if f.read(1) == b"\n":
+            pos -= 1
+        seen = 0
+        while pos > 0:
+            start = max(0, pos - blocksize)
+            f.seek(start)
+            block = f.read(pos - start)
+            idx = len(block)
+            while True:
+                idx = block.rfind(b"\n", 0, idx)
+                if idx < 0:
+                    break
+                seen += 1
+                if seen == keep:
+                    return start + idx + 1
+            pos = start
+    return None
 
 
 def _enforce_retention():
-    """Enforce retention policy."""
+    """Enforce retention policy.
+
+    Amortized: the file may grow TRIM_SLACK lines past MAX_ENTRIES before
+    a trim rewrites the kept tail, so the rewrite cost is spread over
+    many appends instead of paid on every one.
+    """
     if not HISTORY_FILE.exists():
         return
 
-    lines = HISTORY_FILE.read_text().strip().split("\n")
-    if len(lines) <= MAX_ENTRIES:
+    global _INDEX_DIRTY
+    index = _load_index()
+    count = index.get("line_count")
+    if count is None:
+        # Index predates the counter: count the file once to seed it
+        with open(HISTORY_FILE, "rb") as f:
+            count = sum(1 for _ in f)
+        index["line_count"] = count
+        _INDEX_DIRTY += 1
+    if count <= MAX_ENTRIES + TRIM_SLACK:
         return
 
-    # Keep most recent
-    lines = lines[-MAX_ENTRIES:]
-    HISTORY_FILE.write_text("\n".join(lines) + "\n")
+    offset = _tail_offset(HISTORY_FILE, MAX_ENTRIES)
+    if offset is None:
+        # The cached counter overcounted (stale or hand-edited sidecar):
+        # the file already holds MAX_ENTRIES lines or fewer, so resync
+        # the counter from the file and skip the trim
+        with open(HISTORY_FILE, "rb") as f:
+            index["line_count"] = sum(1 for _ in f)
+        _INDEX_DIRTY += 1
+        return
+    with open(HISTORY_FILE, "rb") as f:
+        f.seek(offset)
+        tail = f.read()
+    _close_log_fh()  # reopen after the rewrite so append offsets stay true
+    HISTORY_FILE.write_bytes(tail)
+    index["line_count"] = MAX_ENTRIES
+
+    # Shift surviving byte offsets; trimmed entries drop out of the map
+    id2off = index.get("id2off")
+    if id2off:
+        index["id2off"] = {eid: [off - offset, length]
+                           for eid, (off, length) in id2off.items()
+                           if off >= offset}
+    _INDEX_DIRTY += 1
+
+
+def _iter_lines_mmap(path: Path):
+    """Yield raw byte lines via mmap.
+
+    Full-file scans stay on bytes this way: no whole-file str allocation
+    or UTF-8 decode, and only lines that survive filtering get parsed.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        try:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end < 0:
+                    end = size
+                line = mm[start:end]
+                if line:
+                    yield line
+                start = end + 1
+        finally:
+            mm.close()
+
+
+def _iter_lines_reverse(path: Path, blocksize: int = 64 * 1024):
+    """Yield raw byte lines of a file last-to-first, reading blocks from EOF.
+
+    Lets callers that want the N most recent entries stop after parsing
+    N matches instead of loading and parsing the whole file.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            start = max(0, pos - blocksize)
+            f.seek(start)
+            block = f.read(pos - start) + tail
+            lines = block.split(b"\n")
+            tail = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+            pos = start
+        if tail:
+            yield tail
+
+
+def _entry_epoch(entry: Dict) -> float:
+    """Entry timestamp as a Unix epoch; parses ISO only for old records."""
+    ts = entry.get("ts_epoch")
+    if ts is not None:
+        return ts
+    return datetime.fromisoformat(entry["timestamp"]).timestamp()
+
+
+def _probe_safe(text: Optional[str]) -> bool:
+    """Whether a filter string is safe to probe against raw JSON bytes.
+
+    JSON escapes quotes, backslashes and control characters, so a probe
+    containing any of them would miss entries whose encoded form
+    differs from the literal; those filters fall back to full parsing.
+    """
+    return bool(text) and text.isascii() and '"' not in text \
+        and "\\" not in text and not any(ord(ch) < 0x20 for ch in text)
 
 
 def search_history(
@@ -186,46 +440,76 @@ def search_history(
         return []
 
     results = []
-    since_dt = datetime.fromisoformat(since) if since else None
-
-    for line in HISTORY_FILE.read_text().strip().split("\n"):
-        if not line:
+    # One ISO parse at the boundary; the loop compares epoch floats
+    since_epoch = datetime.fromisoformat(since).timestamp() if since else None
+
+    # Quoted-literal byte probes reject non-matching lines before any
+    # JSON parse; the strict field checks below still decide membership
+    source_probe = f'"{source}"'.encode() if _probe_safe(source) else None
+    tag_probe = f'"{tag}"'.encode() if _probe_safe(tag) else None
+    query_probe = query.lower().encode() if _probe_safe(query) else None
+
+    # Newest-first with early exit: parsing stops once `limit` matches
+    # are found instead of scanning the whole file
+    for raw in _iter_lines_reverse(HISTORY_FILE):
+        if source_probe and source_probe not in raw:
+            continue
+        if tag_probe and tag_probe not in raw:
+            continue
+        if query_probe and query_probe not in raw.lower():
             continue
         try:
-            entry = json.loads(line)
-
-            # Apply filters
-            if source and entry.get("source") != source:
-                continue
-            if tag and tag not in entry.get("tags", []):
-                continue
-            if since_dt:
-                entry_dt = datetime.fromisoformat(entry["timestamp"])
-                if entry_dt < since_dt:
-                    continue
-            if query:
-                if query.lower() not in entry.get("query", "").lower():
-                    continue
-
-            results.append(entry)
+            entry = _loads(raw)
         except json.JSONDecodeError:
             continue
 
-    return results[-limit:]
+        # Apply filters
+        if source and entry.get("source") != source:
+            continue
+        if tag and tag not in entry.get("tags", []):
+            continue
+        if since_epoch is not None and _entry_epoch(entry) < since_epoch:
+            continue
+        if query:
+            if query.lower() not in entry.get("query", "").lower():
+                continue
+
+        results.append(entry)
+        if len(results) >= limit:
+            break
+
+    results.reverse()
+    return results
 
 
+@functools.lru_cache(maxsize=256)
 def get_entry(entry_id: str) -> Optional[Dict]:
-    """Get a specific entry by ID."""
+    """Get a specific entry by ID.
+
+    Memoized per process; log_extraction and clear_history drop the
+    cache whenever the underlying file changes.
+    """
     ensure_history_dir()
 
     if not HISTORY_FILE.exists():
         return None
 
-    for line in HISTORY_FILE.read_text().strip().split("\n"):
-        if not line:
-            continue
+    # Fast path: one seek+read via the byte-offset index
+    located = _load_index().get("id2off", {}).get(entry_id)
+    if located:
+        offset, length = located
         try:
-            entry = json.loads(line)
+            with open(HISTORY_FILE, "rb") as f:
+                f.seek(offset)
+                entry = _loads(f.read(length))
+            if entry.get("id") == entry_id:
+                return entry
+        except (OSError, json.JSONDecodeError):
+            pass  # stale offset; fall back to the scan
+
+    for line in _iter_lines_mmap(HISTORY_FILE):
+        try:
+            entry = _loads(line)
             if entry.get("id") == entry_id:
                 return entry
         except json.JSONDecodeError:
@@ -255,11 +539,9 @@ def get_statistics() -> Dict:
     }
 
     entries = []
-    for line in HISTORY_FILE.read_text().strip().split("\n"):
-        if not line:
-            continue
+    for line in _iter_lines_mmap(HISTORY_FILE):
         try:
-            entry = json.loads(line)
+            entry = _loads(line)
             entries.append(entry)
 
             source = entry.get("source", "unknown")
@@ -296,12 +578,15 @@ def export_history(
     if format == "json":
         return json.dumps(entries, indent=2)
     elif format == "csv":
-        lines = ["id,timestamp,source,query,tags"]
-        for e in entries:
-            query = e.get("query", "").replace('"', '""')[:100]
-            tags = "|".join(e.get("tags", []))
-            lines.append(f'"{e["id"]}","{e["timestamp"]}","{e["source"]}","{query}","{tags}"')
-        return "\n".join(lines)
+        # csv.writer handles quoting of embedded commas/newlines correctly
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["id", "timestamp", "source", "query", "tags"])
+        writer.writerows(
+            (e["id"], e["timestamp"], e["source"],
+             e.get("query", "")[:100], "|".join(e.get("tags", [])))
+            for e in entries)
+        return buf.getvalue().rstrip("\r\n")
     elif format == "markdown":
         lines = ["# Context Extraction History\n"]
         for e in entries:
@@ -317,36 +602,43 @@ def export_history(
 
 def clear_history(older_than_days: Optional[int] = None):
     """Clear history data."""
+    global _INDEX_CACHE, _INDEX_DIRTY
     ensure_history_dir()
+    get_entry.cache_clear()
 
     if older_than_days is None:
-        if HISTORY_FILE.exists():
-            HISTORY_FILE.unlink()
-        if INDEX_FILE.exists():
-            INDEX_FILE.unlink()
+        _close_log_fh()
+        _close_tsv_fhs()
+        _INDEX_CACHE = None
+        _INDEX_DIRTY = 0
+        for path in (HISTORY_FILE, INDEX_FILE, ENTRIES_TSV, SOURCE_TSV, TAG_TSV):
+            if path.exists():
+                path.unlink()
         return {"status": "cleared", "scope": "all"}
 
     if not HISTORY_FILE.exists():
         return {"status": "no_data"}
 
-    cutoff = datetime.now() - timedelta(days=older_than_days)
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).timestamp()
     kept = []
     removed = 0
 
-    for line in HISTORY_FILE.read_text().strip().split("\n"):
-        if not line:
-            continue
+    for line in _iter_lines_mmap(HISTORY_FILE):
         try:
-            entry = json.loads(line)
-            entry_dt = datetime.fromisoformat(entry["timestamp"])
-            if entry_dt >= cutoff:
+            entry = _loads(line)
+            if _entry_epoch(entry) >= cutoff:
                 kept.append(line)
             else:
                 removed += 1
-        except (json.JSONDecodeError, KeyError):
+        except (json.JSONDecodeError, KeyError, ValueError):
             continue
 
-    HISTORY_FILE.write_text("\n".join(kept) + "\n" if kept else "")
+    _close_log_fh()  # reopen after the rewrite so append offsets stay true
+    HISTORY_FILE.write_bytes(b"\n".join(kept) + b"\n" if kept else b"")
+    index = _load_index()
+    index["line_count"] = len(kept)
+    index.pop("id2off", None)  # offsets no longer match the rewritten file
+    _INDEX_DIRTY += 1
     return {"status": "cleared", "removed": removed, "kept": len(kept)}
 
 
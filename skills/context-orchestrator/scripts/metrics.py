@@ -6,14 +6,36 @@ Tracks usage patterns, latency, and outcomes for context extraction operations.
 Provides insights for optimization and debugging.
 """
 
+import atexit
 import json
+import math
+import mmap
 import os
+import random
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
-import hashlib
+import base64
+
+try:
+    # Rust-backed serializer, ~5-10x faster than stdlib json for payloads
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+try:
+    # C-backed aggregation for the latency percentiles in summaries
+    import numpy as _np
+except ImportError:
+    _np = None
 
 METRICS_DIR = Path.home() / ".claude" / ".context-cache" / "metrics"
 METRICS_FILE = METRICS_DIR / "usage.jsonl"
@@ -22,6 +44,7 @@ SUMMARY_FILE = METRICS_DIR / "summary.json"
 # Retention policy
 MAX_EVENTS = 1000
 MAX_AGE_DAYS = 30
+TRIM_SLACK = 50  # appends allowed past MAX_EVENTS before trimming
 
 
 def ensure_metrics_dir():
@@ -29,6 +52,27 @@ def ensure_metrics_dir():
     METRICS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Kept open across log calls so each append is one buffered write
+# instead of an open/write/close syscall triplet
+_LOG_FH = None
+
+
+def _get_log_fh():
+    global _LOG_FH
+    if _LOG_FH is None:
+        ensure_metrics_dir()
+        _LOG_FH = open(METRICS_FILE, "ab", buffering=64 * 1024)
+        atexit.register(_close_log_fh)
+    return _LOG_FH
+
+
+def _close_log_fh():
+    global _LOG_FH
+    if _LOG_FH is not None:
+        _LOG_FH.close()
+        _LOG_FH = None
+
+
 def log_event(event_type: str, data: Dict[str, Any]) -> Dict:
     """
     Log a context extraction event.
@@ -44,16 +88,23 @@ def log_event(event_type: str, data: Dict[str, Any]) -> Dict:
     """
     ensure_metrics_dir()
 
+    # One clock read per log call; the ISO string and epoch stay in sync
+    now = datetime.now()
+
     event = {
-        "id": hashlib.md5(f"{datetime.now().isoformat()}{event_type}".encode()).hexdigest()[:12],
-        "timestamp": datetime.now().isoformat(),
+        # 64 random bits base32-encoded: same 12-char shape as the old
+        # truncated md5 without a hash round per log call
+        "id": base64.b32encode(os.urandom(8)).decode('ascii').rstrip('=').lower()[:12],
+        "timestamp": now.isoformat(),
+        "ts_epoch": now.timestamp(),
         "event_type": event_type,
         "data": data,
     }
 
-    # Append to JSONL file
-    with open(METRICS_FILE, "a") as f:
-        f.write(json.dumps(event) + "\n")
+    # Append to JSONL file; flushed so retention sees a complete file
+    fh = _get_log_fh()
+    fh.write((_dumps(event) + "\n").encode("utf-8"))
+    fh.flush()
 
     # Enforce retention
     _enforce_retention()
@@ -61,18 +112,130 @@ def log_event(event_type: str, data: Dict[str, Any]) -> Dict:
     return event
 
 
+def _tail_offset(path: Path, keep: int, blocksize: int = 64 * 1024) -> Optional[int]:
+    """Byte offset where the last `keep` lines of a file start.
+
+    Scans blocks backwards from EOF, so the cost is bounded by the kept
+    tail rather than the whole file. Returns None when the file holds
+    `keep` lines or fewer.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        if pos == 0:
+            return None
+        # The trailing newline does not start a new line
+        f.seek(pos - 1)
+        if f.read(1) == b"\n":
+            pos -= 1
+        seen = 0
+        while pos > 0:
+            start = max(0, pos - blocksize)
+            f.seek(start)
+            block = f.read(pos - start)
+            idx = len(block)
+            while True:
+                idx = block.rfind(b"\n", 0, idx)
+                if idx < 0:
+                    break
+                seen += 1
+                if seen == keep:
+                    return start + idx + 1
+            pos = start
+    return None
+
+
 def _enforce_retention():
-    """Enforce retention policy on metrics file."""
+    """Enforce retention policy on metrics file.
+
+    Amortized: the file may grow TRIM_SLACK lines past MAX_EVENTS before
+    a trim rewrites the kept tail, so the rewrite cost is spread over
+    many appends instead of paid on every one.
+    """
     if not METRICS_FILE.exists():
         return
 
-    lines = METRICS_FILE.read_text().strip().split("\n")
-    if len(lines) <= MAX_EVENTS:
+    if _tail_offset(METRICS_FILE, MAX_EVENTS + TRIM_SLACK) is None:
         return
 
-    # Keep only most recent events
-    lines = lines[-MAX_EVENTS:]
-    METRICS_FILE.write_text("\n".join(lines) + "\n")
+    offset = _tail_offset(METRICS_FILE, MAX_EVENTS)
+    if offset is None:
+        # Only reachable if the file shrank between the two scans; either
+        # way there is nothing left to trim
+        return
+    with open(METRICS_FILE, "rb") as f:
+        f.seek(offset)
+        tail = f.read()
+    METRICS_FILE.write_bytes(tail)
+
+
+def _iter_lines_mmap(path: Path):
+    """Yield raw byte lines via mmap.
+
+    Full-file scans stay on bytes this way: no whole-file str allocation
+    or UTF-8 decode, and only lines that survive filtering get parsed.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        try:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end < 0:
+                    end = size
+                line = mm[start:end]
+                if line:
+                    yield line
+                start = end + 1
+        finally:
+            mm.close()
+
+
+def _iter_lines_reverse(path: Path, blocksize: int = 64 * 1024):
+    """Yield raw byte lines of a file last-to-first, reading blocks from EOF.
+
+    Lets callers that want the N most recent events stop after parsing
+    N matches instead of loading and parsing the whole file.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            start = max(0, pos - blocksize)
+            f.seek(start)
+            block = f.read(pos - start) + tail
+            lines = block.split(b"\n")
+            tail = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+            pos = start
+        if tail:
+            yield tail
+
+
+def _event_epoch(event: Dict) -> float:
+    """Event timestamp as a Unix epoch; parses ISO only for old records."""
+    ts = event.get("ts_epoch")
+    if ts is not None:
+        return ts
+    return datetime.fromisoformat(event["timestamp"]).timestamp()
+
+
+def _probe_safe(text: Optional[str]) -> bool:
+    """Whether a filter string is safe to probe against raw JSON bytes.
+
+    JSON escapes quotes, backslashes and control characters, so a probe
+    containing any of them would miss entries whose encoded form
+    differs from the literal; those filters fall back to full parsing.
+    """
+    return bool(text) and text.isascii() and '"' not in text \
+        and "\\" not in text and not any(ord(ch) < 0x20 for ch in text)
 
 
 def get_events(
@@ -87,61 +250,106 @@ def get_events(
     if not METRICS_FILE.exists():
         return []
 
+    # One conversion at the boundary; the loop compares epoch floats
+    since_epoch = since.timestamp() if since else None
+
+    # Quoted-literal byte probes reject non-matching lines before any
+    # JSON parse; the strict field checks below still decide membership
+    type_probe = f'"{event_type}"'.encode() if _probe_safe(event_type) else None
+    source_probe = f'"{source}"'.encode() if _probe_safe(source) else None
+
     events = []
-    for line in METRICS_FILE.read_text().strip().split("\n"):
-        if not line:
+    # Newest-first with early exit: parsing stops once `limit` matches
+    # are found instead of scanning the whole file
+    for raw in _iter_lines_reverse(METRICS_FILE):
+        if type_probe and type_probe not in raw:
             continue
+        if source_probe and source_probe not in raw:
+            continue
+        try:
+            event = _loads(raw)
+        except json.JSONDecodeError:
+            continue
+
+        # Apply filters
+        if event_type and event.get("event_type") != event_type:
+            continue
+        if source and event.get("data", {}).get("source") != source:
+            continue
+        if since_epoch is not None and _event_epoch(event) < since_epoch:
+            continue
+
+        events.append(event)
+        if len(events) >= limit:
+            break
+
+    events.reverse()
+    return events
+
+
+def _stream_events(path: Path):
+    """Yield parsed events one line at a time without buffering the file."""
+    for line in _iter_lines_mmap(path):
         try:
-            event = json.loads(line)
-
-            # Apply filters
-            if event_type and event.get("event_type") != event_type:
-                continue
-            if source and event.get("data", {}).get("source") != source:
-                continue
-            if since:
-                event_time = datetime.fromisoformat(event["timestamp"])
-                if event_time < since:
-                    continue
-
-            events.append(event)
+            yield _loads(line)
         except json.JSONDecodeError:
             continue
 
-    return events[-limit:]
+
+# Latency samples kept per source for percentile estimation; count, sum,
+# min and max are exact running values regardless of this bound
+_RESERVOIR_SIZE = 512
+
+# Last computed summary keyed by the metrics file's stat signature, so
+# repeated summary/recommendations calls with no new events are free
+_SUMMARY_CACHE = None
 
 
 def calculate_summary() -> Dict:
-    """Calculate usage summary statistics."""
+    """Calculate usage summary statistics.
+
+    Aggregates in a single streaming pass over the metrics file instead
+    of materializing every event via get_events and iterating again.
+    """
+    global _SUMMARY_CACHE
     ensure_metrics_dir()
 
     if not METRICS_FILE.exists():
         return {"error": "No metrics data available"}
 
-    events = get_events(limit=MAX_EVENTS)
-
-    if not events:
-        return {"error": "No events found"}
+    try:
+        st = os.stat(METRICS_FILE)
+        sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = None
+    if sig is not None and _SUMMARY_CACHE and _SUMMARY_CACHE[0] == sig:
+        return _SUMMARY_CACHE[1]
 
     summary = {
         "generated_at": datetime.now().isoformat(),
-        "total_events": len(events),
+        "total_events": 0,
         "event_counts": defaultdict(int),
         "source_usage": defaultdict(int),
         "cache_stats": {"hits": 0, "misses": 0, "hit_rate": 0.0},
-        "latency_stats": defaultdict(list),
+        "latency_stats": {},
         "error_count": 0,
-        "time_range": {
-            "earliest": events[0]["timestamp"] if events else None,
-            "latest": events[-1]["timestamp"] if events else None,
-        },
+        "time_range": {"earliest": None, "latest": None},
     }
 
-    for event in events:
+    # Per-source running aggregates; only percentiles need samples, and
+    # those come from a bounded reservoir (Algorithm R) instead of an
+    # unbounded list per source
+    lat_agg = {}
+
+    for event in _stream_events(METRICS_FILE):
         event_type = event.get("event_type", "unknown")
         data = event.get("data", {})
 
-        # Count events
+        # Count events and track the time range inline
+        summary["total_events"] += 1
+        if summary["time_range"]["earliest"] is None:
+            summary["time_range"]["earliest"] = event.get("timestamp")
+        summary["time_range"]["latest"] = event.get("timestamp")
         summary["event_counts"][event_type] += 1
 
         # Track source usage
@@ -157,12 +365,34 @@ def calculate_summary() -> Dict:
         # Track latency
         if latency := data.get("latency_ms"):
             source = data.get("source", "unknown")
-            summary["latency_stats"][source].append(latency)
+            agg = lat_agg.get(source)
+            if agg is None:
+                agg = lat_agg[source] = {
+                    "count": 0, "sum": 0.0,
+                    "min": math.inf, "max": -math.inf,
+                    "reservoir": [],
+                }
+            agg["count"] += 1
+            agg["sum"] += latency
+            if latency < agg["min"]:
+                agg["min"] = latency
+            if latency > agg["max"]:
+                agg["max"] = latency
+            reservoir = agg["reservoir"]
+            if len(reservoir) < _RESERVOIR_SIZE:
+                reservoir.append(latency)
+            else:
+                j = random.randrange(agg["count"])
+                if j < _RESERVOIR_SIZE:
+                    reservoir[j] = latency
 
         # Count errors
         if data.get("error"):
             summary["error_count"] += 1
 
+    if summary["total_events"] == 0:
+        return {"error": "No events found"}
+
     # Calculate cache hit rate
     total_cache = summary["cache_stats"]["hits"] + summary["cache_stats"]["misses"]
     if total_cache > 0:
@@ -170,28 +400,38 @@ def calculate_summary() -> Dict:
             summary["cache_stats"]["hits"] / total_cache * 100, 1
         )
 
-    # Calculate latency percentiles
+    # Finalize latency stats: exact count/min/max/avg from the running
+    # aggregates, percentiles estimated from the reservoir
     latency_summary = {}
-    for source, latencies in summary["latency_stats"].items():
-        if latencies:
-            sorted_lat = sorted(latencies)
-            latency_summary[source] = {
-                "count": len(latencies),
-                "min_ms": min(latencies),
-                "max_ms": max(latencies),
-                "avg_ms": round(sum(latencies) / len(latencies), 1),
-                "p50_ms": sorted_lat[len(sorted_lat) // 2],
-                "p90_ms": sorted_lat[int(len(sorted_lat) * 0.9)] if len(sorted_lat) >= 10 else sorted_lat[-1],
-            }
+    for source, agg in lat_agg.items():
+        stats = {
+            "count": agg["count"],
+            "min_ms": agg["min"],
+            "max_ms": agg["max"],
+            "avg_ms": round(agg["sum"] / agg["count"], 1),
+        }
+        reservoir = agg["reservoir"]
+        if _np is not None:
+            arr = _np.asarray(reservoir, dtype=_np.float64)
+            stats["p50_ms"] = float(_np.percentile(arr, 50, method="lower"))
+            stats["p90_ms"] = float(_np.percentile(arr, 90, method="lower"))
+        else:
+            sorted_lat = sorted(reservoir)
+            stats["p50_ms"] = sorted_lat[len(sorted_lat) // 2]
+            stats["p90_ms"] = sorted_lat[int(len(sorted_lat) * 0.9)] if len(sorted_lat) >= 10 else sorted_lat[-1]
+        latency_summary[source] = stats
     summary["latency_stats"] = latency_summary
 
     # Convert defaultdicts
     summary["event_counts"] = dict(summary["event_counts"])
     summary["source_usage"] = dict(summary["source_usage"])
 
-    # Save summary
+    # Save summary; compact separators since only tooling reads this copy
     with open(SUMMARY_FILE, "w") as f:
-        json.dump(summary, f, indent=2)
+        json.dump(summary, f, separators=(",", ":"))
+
+    if sig is not None:
+        _SUMMARY_CACHE = (sig, summary)
 
     return summary
 
@@ -250,10 +490,13 @@ def get_recommendations() -> List[str]:
 
 def clear_metrics(older_than_days: Optional[int] = None):
     """Clear metrics data."""
+    global _SUMMARY_CACHE
+    _SUMMARY_CACHE = None
     ensure_metrics_dir()
 
     if older_than_days is None:
         # Clear all
+        _close_log_fh()
         if METRICS_FILE.exists():
             METRICS_FILE.unlink()
         if SUMMARY_FILE.exists():
@@ -264,24 +507,22 @@ def clear_metrics(older_than_days: Optional[int] = None):
     if not METRICS_FILE.exists():
         return {"status": "no_data"}
 
-    cutoff = datetime.now() - timedelta(days=older_than_days)
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).timestamp()
     kept_lines = []
     removed = 0
 
-    for line in METRICS_FILE.read_text().strip().split("\n"):
-        if not line:
-            continue
+    for line in _iter_lines_mmap(METRICS_FILE):
         try:
-            event = json.loads(line)
-            event_time = datetime.fromisoformat(event["timestamp"])
-            if event_time >= cutoff:
+            event = _loads(line)
+            if _event_epoch(event) >= cutoff:
                 kept_lines.append(line)
             else:
                 removed += 1
-        except (json.JSONDecodeError, KeyError):
+        except (json.JSONDecodeError, KeyError, ValueError):
             continue
 
-    METRICS_FILE.write_text("\n".join(kept_lines) + "\n" if kept_lines else "")
+    _close_log_fh()  # reopen after the rewrite so appends land at the new end
+    METRICS_FILE.write_bytes(b"\n".join(kept_lines) + b"\n" if kept_lines else b"")
     return {"status": "cleared", "removed": removed, "kept": len(kept_lines)}
 
 
@@ -22,10 +22,23 @@ Usage:
 
 import json
 import argparse
+import sys
 from collections import defaultdict
 from typing import Dict, List, Set, Tuple, Any, Optional
 from dataclasses import dataclass, field
-import hashlib
+
+try:
+    # Rust-backed serializer, ~5-10x faster than stdlib json for payloads
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        # Non-str keys (orbit IDs) are coerced to strings like stdlib json
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
 
 
 @dataclass
@@ -54,12 +67,36 @@ class Graph:
     """Knowledge graph with nodes and edges."""
     nodes: Dict[str, Node] = field(default_factory=dict)
     edges: List[Edge] = field(default_factory=list)
-    
+    _out_adj: Optional[Dict[str, List[Edge]]] = field(
+        default=None, repr=False, compare=False)
+    _in_adj: Optional[Dict[str, List[Edge]]] = field(
+        default=None, repr=False, compare=False)
+
+    def build_adjacency(self):
+        """Index edges by endpoint in one O(E) pass.
+
+        The refinement loops ask for a node's edges once per node per
+        depth; without this index each ask re-scans the whole edge list,
+        making k-bisimulation O(k·N·E). Built lazily on first access, so
+        edges appended afterwards require calling this again.
+        """
+        out_adj = defaultdict(list)
+        in_adj = defaultdict(list)
+        for edge in self.edges:
+            out_adj[edge.source].append(edge)
+            in_adj[edge.target].append(edge)
+        self._out_adj = dict(out_adj)
+        self._in_adj = dict(in_adj)
+
     def outgoing_edges(self, node_id: str) -> List[Edge]:
-        return [e for e in self.edges if e.source == node_id]
-    
+        if self._out_adj is None:
+            self.build_adjacency()
+        return self._out_adj.get(node_id, [])
+
     def incoming_edges(self, node_id: str) -> List[Edge]:
-        return [e for e in self.edges if e.target == node_id]
+        if self._in_adj is None:
+            self.build_adjacency()
+        return self._in_adj.get(node_id, [])
     
     def neighbors(self, node_id: str, direction: str = 'both') -> Set[str]:
         """Get neighbor node IDs."""
@@ -98,44 +135,35 @@ class KBisimulationCompressor:
         self.k = k
         self.preserve_queries = preserve_queries or ['reachability']
         
-    def compute_signature(self, 
-                          graph: Graph, 
-                          node_id: str, 
+    def compute_signature(self,
+                          graph: Graph,
+                          node_id: str,
                           partition: Dict[str, int],
-                          depth: int) -> str:
+                          depth: int) -> Tuple:
         """
         Compute structural signature for a node at given depth.
-        
+
         Signature encodes:
         - Node's own type/label
         - For each edge type: sorted list of (edge_type, neighbor_class) pairs
-        
-        Nodes with identical signatures are structurally equivalent at this depth.
+
+        Nodes with identical signatures are structurally equivalent at this
+        depth. The signature is a plain tuple: hashing tuples of small
+        values is far cheaper than formatting, joining and md5-hashing
+        strings, and collisions are impossible rather than improbable.
         """
         node = graph.nodes[node_id]
-        
-        # Base signature: node type
-        sig_parts = [f"type:{node.node_type}"]
-        
-        # Outgoing edge signature
-        out_sig = []
-        for edge in graph.outgoing_edges(node_id):
-            neighbor_class = partition.get(edge.target, 0)
-            out_sig.append(f"out:{edge.edge_type}→{neighbor_class}")
-        out_sig.sort()
-        sig_parts.extend(out_sig)
-        
+
+        out_sig = tuple(sorted(
+            (edge.edge_type, partition.get(edge.target, 0))
+            for edge in graph.outgoing_edges(node_id)))
+
         # Incoming edge signature (for full bisimulation)
-        in_sig = []
-        for edge in graph.incoming_edges(node_id):
-            neighbor_class = partition.get(edge.source, 0)
-            in_sig.append(f"in:{neighbor_class}→{edge.edge_type}")
-        in_sig.sort()
-        sig_parts.extend(in_sig)
-        
-        # Hash the signature for efficiency
-        sig_string = "|".join(sig_parts)
-        return hashlib.md5(sig_string.encode()).hexdigest()
+        in_sig = tuple(sorted(
+            (partition.get(edge.source, 0), edge.edge_type)
+            for edge in graph.incoming_edges(node_id)))
+
+        return (node.node_type, out_sig, in_sig)
     
     def compute_initial_partition(self, graph: Graph) -> Dict[str, int]:
         """
@@ -156,144 +184,184 @@ class KBisimulationCompressor:
             
         return partition
     
-    def refine_partition(self, 
-                         graph: Graph, 
-                         partition: Dict[str, int],
-                         depth: int) -> Tuple[Dict[str, int], bool]:
-        """
-        Refine partition by splitting classes with different signatures.
-        
-        Returns:
-            New partition and whether any refinement occurred
-        """
-        # Group nodes by current class
-        class_to_nodes = defaultdict(list)
-        for node_id, class_id in partition.items():
-            class_to_nodes[class_id].append(node_id)
-        
-        # Build new partition
-        new_partition = {}
-        next_class = 0
-        changed = False
-        
-        for class_id, node_ids in class_to_nodes.items():
-            # Compute signatures for all nodes in this class
-            sig_to_nodes = defaultdict(list)
-            for node_id in node_ids:
-                sig = self.compute_signature(graph, node_id, partition, depth)
-                sig_to_nodes[sig].append(node_id)
-            
-            # If multiple signatures, class needs splitting
-            if len(sig_to_nodes) > 1:
-                changed = True
-            
-            # Assign new class IDs
-            for nodes in sig_to_nodes.values():
-                for node_id in nodes:
-                    new_partition[node_id] = next_class
-                next_class += 1
-                
-        return new_partition, changed
-    
     def compute_k_bisimulation(self, graph: Graph) -> Dict[str, int]:
         """
         Compute k-bisimulation equivalence classes.
-        
-        Iteratively refines partition until:
-        1. No changes occur (fixpoint reached), or
-        2. Depth k is reached
-        
+
+        Incremental refinement in the Paige-Tarjan spirit: a node's
+        signature can only change when a neighbor moved to a new class,
+        so each round re-examines just the classes holding such nodes
+        instead of re-signing the whole graph. Classes keep their IDs
+        when they split (one group retains the old ID, the rest get
+        fresh ones), which leaves untouched signatures valid.
+
+        Stops when a round moves no nodes (fixpoint) or at depth k.
         For most graphs, refinement stabilizes well before k=5.
         """
         partition = self.compute_initial_partition(graph)
-        
+
+        class_to_nodes = defaultdict(list)
+        for node_id, class_id in partition.items():
+            class_to_nodes[class_id].append(node_id)
+        next_class = max(class_to_nodes, default=-1) + 1
+
+        # Every node is dirty before the first round, which also seeds the
+        # signature cache below for every node
+        dirty = set(partition)
+
+        # node -> last computed signature; valid until a neighbor moves,
+        # at which point the node lands back in `dirty`. Local to this
+        # call so reusing a compressor across graphs stays safe.
+        sig_cache: Dict[str, Tuple] = {}
+
         for depth in range(self.k):
-            partition, changed = self.refine_partition(graph, partition, depth)
-            if not changed:
+            affected_classes = sorted({partition[n] for n in dirty})
+            moved = []
+
+            for class_id in affected_classes:
+                node_ids = class_to_nodes[class_id]
+                if len(node_ids) <= 1:
+                    continue
+
+                sig_to_nodes = defaultdict(list)
+                for node_id in node_ids:
+                    if node_id in dirty:
+                        sig = sig_cache[node_id] = self.compute_signature(
+                            graph, node_id, partition, depth)
+                    else:
+                        # Clean member of a class another member dirtied:
+                        # its own neighborhood is unchanged, reuse the sig
+                        sig = sig_cache[node_id]
+                    sig_to_nodes[sig].append(node_id)
+
+                if len(sig_to_nodes) == 1:
+                    continue
+
+                # First group keeps the ID; the rest split off
+                groups = iter(sig_to_nodes.values())
+                class_to_nodes[class_id] = next(groups)
+                for group in groups:
+                    for node_id in group:
+                        partition[node_id] = next_class
+                    class_to_nodes[next_class] = group
+                    moved.extend(group)
+                    next_class += 1
+
+            if not moved:
                 break
-                
+
+            # Only neighbors of moved nodes can change signature next round
+            dirty = set()
+            for node_id in moved:
+                for edge in graph.outgoing_edges(node_id):
+                    dirty.add(edge.target)
+                for edge in graph.incoming_edges(node_id):
+                    dirty.add(edge.source)
+
         return partition
     
-    def build_quotient_graph(self, 
-                              graph: Graph, 
-                              partition: Dict[str, int]) -> Graph:
+    def build_quotient_graph(self,
+                              graph: Graph,
+                              partition: Dict[str, int],
+                              keep_members: bool = False) -> Graph:
         """
         Build quotient graph from equivalence partition.
-        
+
         The quotient has:
         - One node per equivalence class (using canonical representative)
         - Edges between classes if any members have edges between them
-        
+
         This is the categorical quotient construction with universal property:
         Any functor respecting the equivalence factors through this quotient.
+
+        Member lists are only materialized when keep_members is set:
+        storing every member ID in the quotient makes its payload as large
+        as the original graph, defeating the compression.
         """
-        # Find canonical representative for each class (lowest id)
-        class_to_representative = {}
-        class_to_members = defaultdict(list)
-        
+        # One pass over the partition accumulates representative (lowest
+        # id), class size and max confidence per class
+        class_info = {}  # class_id -> [rep, size, max_confidence, members]
+
         for node_id, class_id in partition.items():
-            class_to_members[class_id].append(node_id)
-            
-        for class_id, members in class_to_members.items():
-            members.sort()
-            class_to_representative[class_id] = members[0]
-        
+            confidence = graph.nodes[node_id].confidence
+            info = class_info.get(class_id)
+            if info is None:
+                class_info[class_id] = info = [
+                    node_id, 0, confidence, [] if keep_members else None]
+            else:
+                if node_id < info[0]:
+                    info[0] = node_id
+                if confidence > info[2]:
+                    info[2] = confidence
+            info[1] += 1
+            if keep_members:
+                info[3].append(node_id)
+
+        class_to_representative = {
+            class_id: info[0] for class_id, info in class_info.items()}
+
         # Build quotient nodes
         quotient = Graph()
-        for class_id, rep_id in class_to_representative.items():
+        for class_id, (rep_id, size, max_confidence, members) in class_info.items():
             original = graph.nodes[rep_id]
-            members = class_to_members[class_id]
-            
-            # Aggregate confidence (max of members)
-            max_confidence = max(graph.nodes[m].confidence for m in members)
-            
+
+            properties = {
+                'class_size': size,
+                'compression_type': 'k-bisimulation',
+                **original.properties
+            }
+            if keep_members:
+                properties['members'] = members
+
             quotient.nodes[rep_id] = Node(
                 id=rep_id,
                 label=original.label,
                 node_type=original.node_type,
                 confidence=max_confidence,
-                properties={
-                    'class_size': len(members),
-                    'members': members,
-                    'compression_type': 'k-bisimulation',
-                    **original.properties
-                }
+                properties=properties
             )
         
-        # Build quotient edges (unique class-to-class connections)
+        # Build quotient edges (unique class-to-class connections).
+        # Dedup keys are single packed ints: class IDs are already small
+        # ints and edge types get interned on the fly, so hashing one int
+        # replaces hashing a 3-tuple of strings per original edge.
+        # (Bounds: <2^24 target classes, <2^16 edge types.)
+        etype_ids = {}
         seen_edges = set()
         edge_count = 0
-        
+
         for edge in graph.edges:
             source_class = partition[edge.source]
             target_class = partition[edge.target]
-            source_rep = class_to_representative[source_class]
-            target_rep = class_to_representative[target_class]
-            
-            edge_key = (source_rep, target_rep, edge.edge_type)
+
+            etype_id = etype_ids.setdefault(edge.edge_type, len(etype_ids))
+            edge_key = (source_class << 40) | (target_class << 16) | etype_id
             if edge_key not in seen_edges:
                 seen_edges.add(edge_key)
+                source_rep = class_to_representative[source_class]
+                target_rep = class_to_representative[target_class]
                 quotient.edges.append(Edge(
                     id=f"e_{edge_count}",
                     source=source_rep,
                     target=target_rep,
                     edge_type=edge.edge_type,
-                    strength=edge.strength,
-                    properties={'compressed': True}
+                    strength=edge.strength
                 ))
                 edge_count += 1
                 
         return quotient
     
-    def compress(self, graph: Graph) -> Tuple[Graph, Dict[str, Any]]:
+    def compress(self, graph: Graph,
+                 keep_members: bool = False) -> Tuple[Graph, Dict[str, Any]]:
         """
         Compress graph using k-bisimulation.
-        
+
         Returns:
             Compressed graph and compression metadata
         """
         partition = self.compute_k_bisimulation(graph)
-        quotient = self.build_quotient_graph(graph, partition)
+        quotient = self.build_quotient_graph(graph, partition,
+                                             keep_members=keep_members)
         
         # Compute metrics
         original_nodes = len(graph.nodes)
@@ -345,52 +413,69 @@ class AutomorphismCompressor:
     def __init__(self):
         self.orbits = {}
         
-    def compute_degree_sequence(self, graph: Graph, node_id: str) -> Tuple[int, int]:
-        """Compute (in_degree, out_degree) for a node."""
-        in_deg = len(graph.incoming_edges(node_id))
-        out_deg = len(graph.outgoing_edges(node_id))
-        return (in_deg, out_deg)
-    
-    def compute_initial_coloring(self, graph: Graph) -> Dict[str, str]:
+    def compute_initial_coloring(self, graph: Graph) -> Dict[str, Tuple]:
         """
         Initial node coloring based on type and degree.
-        
-        Nodes with different colorings cannot be in same orbit.
+
+        Nodes with different colorings cannot be in same orbit. Degrees
+        are accumulated in one pass over the edge list rather than per
+        node through the adjacency index.
         """
+        in_deg = defaultdict(int)
+        out_deg = defaultdict(int)
+        for edge in graph.edges:
+            out_deg[edge.source] += 1
+            in_deg[edge.target] += 1
+
         coloring = {}
         for node_id, node in graph.nodes.items():
-            deg_seq = self.compute_degree_sequence(graph, node_id)
-            coloring[node_id] = f"{node.node_type}|{deg_seq}"
+            coloring[node_id] = (node.node_type, (in_deg[node_id], out_deg[node_id]))
         return coloring
-    
-    def refine_coloring(self, 
-                        graph: Graph, 
-                        coloring: Dict[str, str],
-                        max_iterations: int = 10) -> Dict[str, str]:
+
+    def refine_coloring(self,
+                        graph: Graph,
+                        coloring: Dict[str, Tuple],
+                        max_iterations: int = 10) -> Dict[str, int]:
         """
         Weisfeiler-Leman style coloring refinement.
-        
+
         Iteratively refines colors based on neighbor colors until stable.
+        Colors are interned to small integers each round, so per-node
+        state stays O(degree) tuples instead of concatenated history
+        strings that double in length every iteration.
         """
+        # Intern the initial colors so every round works on ints
+        color_ids: Dict[Tuple, int] = {}
+        current = {node_id: color_ids.setdefault(color, len(color_ids))
+                   for node_id, color in coloring.items()}
+        num_colors = len(color_ids)
+
         for _ in range(max_iterations):
+            if num_colors == len(current):
+                break  # discrete coloring cannot refine further
+
+            sig_ids: Dict[Tuple, int] = {}
             new_coloring = {}
             for node_id in graph.nodes:
                 # Get sorted neighbor colors
                 neighbor_colors = []
                 for edge in graph.outgoing_edges(node_id):
-                    neighbor_colors.append(f"out:{edge.edge_type}:{coloring[edge.target]}")
+                    neighbor_colors.append((0, edge.edge_type, current[edge.target]))
                 for edge in graph.incoming_edges(node_id):
-                    neighbor_colors.append(f"in:{edge.edge_type}:{coloring[edge.source]}")
+                    neighbor_colors.append((1, edge.edge_type, current[edge.source]))
                 neighbor_colors.sort()
-                
-                new_coloring[node_id] = f"{coloring[node_id]}|{'|'.join(neighbor_colors)}"
-            
-            # Check if stable
-            if new_coloring == coloring:
+
+                sig = (current[node_id], tuple(neighbor_colors))
+                new_coloring[node_id] = sig_ids.setdefault(sig, len(sig_ids))
+
+            # Refinement only ever splits classes, so an unchanged class
+            # count means the partition is stable: no dict comparison
+            if len(sig_ids) == num_colors:
                 break
-            coloring = new_coloring
-            
-        return coloring
+            num_colors = len(sig_ids)
+            current = new_coloring
+
+        return current
     
     def compute_orbits(self, graph: Graph) -> Dict[str, int]:
         """
@@ -416,70 +501,90 @@ class AutomorphismCompressor:
         self.orbits = partition
         return partition
     
-    def compress(self, graph: Graph) -> Tuple[Graph, Dict[str, Any]]:
+    def compress(self, graph: Graph,
+                 keep_members: bool = False) -> Tuple[Graph, Dict[str, Any]]:
         """Compress using orbit quotient."""
         partition = self.compute_orbits(graph)
-        
+
         # Use k-bisimulation quotient builder
         compressor = KBisimulationCompressor(k=0)
-        quotient = compressor.build_quotient_graph(graph, partition)
+        quotient = compressor.build_quotient_graph(graph, partition,
+                                                   keep_members=keep_members)
         
         original_nodes = len(graph.nodes)
         compressed_nodes = len(quotient.nodes)
-        
+
+        # Single counting pass instead of one scan per distinct orbit
+        orbit_sizes = defaultdict(int)
+        for orbit in partition.values():
+            orbit_sizes[orbit] += 1
+
         metadata = {
             'method': 'automorphism-orbit',
             'original_nodes': original_nodes,
             'compressed_nodes': compressed_nodes,
             'node_compression_ratio': round(1 - compressed_nodes/original_nodes, 4) if original_nodes > 0 else 0,
-            'num_orbits': len(set(partition.values())),
-            'orbit_sizes': dict(sorted(
-                defaultdict(int, {o: sum(1 for v in partition.values() if v == o) 
-                                  for o in set(partition.values())}).items()
-            ))
+            'num_orbits': len(orbit_sizes),
+            'orbit_sizes': dict(sorted(orbit_sizes.items())),
+            'partition': partition
         }
         
         return quotient, metadata
 
 
+# Reserved record keys, hoisted so the per-record property filters test
+# membership against a frozenset instead of rebuilding a list every row
+_NODE_KEYS = frozenset(('id', 'label', 'type', 'confidence'))
+_EDGE_KEYS = frozenset(('id', 'source', 'target', 'type', 'strength'))
+
+
 def load_graph(filepath: str) -> Graph:
     """Load graph from JSON file."""
-    with open(filepath) as f:
-        data = json.load(f)
-    
+    with open(filepath, 'rb') as f:
+        data = _loads(f.read())
+
     graph = Graph()
-    
+
     # Handle both formats: {nodes: [...], edges: [...]} or {graph: {nodes: [...], edges: [...]}}
     graph_data = data.get('graph', data)
-    
+
     for node_data in graph_data.get('nodes', []):
         node = Node(
             id=node_data['id'],
             label=node_data.get('label', node_data['id']),
-            node_type=node_data.get('type', 'entity'),
+            # Few distinct types, hashed constantly in signatures:
+            # interning makes their == and hash() identity-fast
+            node_type=sys.intern(node_data.get('type', 'entity')),
             confidence=node_data.get('confidence', 1.0),
-            properties={k: v for k, v in node_data.items() 
-                       if k not in ['id', 'label', 'type', 'confidence']}
+            properties={k: v for k, v in node_data.items()
+                       if k not in _NODE_KEYS}
         )
         graph.nodes[node.id] = node
-        
+
     for edge_data in graph_data.get('edges', []):
         edge = Edge(
             id=edge_data.get('id', f"e_{len(graph.edges)}"),
             source=edge_data['source'],
             target=edge_data['target'],
-            edge_type=edge_data.get('type', 'related_to'),
+            edge_type=sys.intern(edge_data.get('type', 'related_to')),
             strength=edge_data.get('strength', 1.0),
             properties={k: v for k, v in edge_data.items()
-                       if k not in ['id', 'source', 'target', 'type', 'strength']}
+                       if k not in _EDGE_KEYS}
         )
         graph.edges.append(edge)
-        
+
     return graph
 
 
-def save_graph(graph: Graph, metadata: Dict[str, Any], filepath: str):
-    """Save compressed graph to JSON."""
+def save_graph(graph: Graph, metadata: Dict[str, Any], filepath: str,
+               pretty: bool = False):
+    """Save compressed graph to JSON (compact unless pretty is set).
+
+    The node -> class partition map has one entry per original node, so
+    embedding it would make the quotient file scale with the input graph;
+    it is left out here and written separately by save_partition.
+    """
+    metadata = {k: v for k, v in metadata.items() if k != 'partition'}
     data = {
         'meta': {
             'compression_method': metadata.get('method'),
@@ -514,7 +619,31 @@ def save_graph(graph: Graph, metadata: Dict[str, Any], filepath: str):
     }
     
     with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+        if pretty:
+            json.dump(data, f, indent=2)
+        else:
+            f.write(_dumps(data))
+
+
+def save_partition(metadata: Dict[str, Any], filepath: str):
+    """Write the node -> representative mapping as a compact sidecar JSON.
+
+    Class IDs in the partition are internal ints; the quotient names each
+    class after its lowest member id (see build_quotient_graph), so the
+    sidecar uses those representative ids and maps straight onto quotient
+    node ids for downstream tools like verify_compression.py.
+    """
+    partition = metadata.get('partition', {})
+    representatives: Dict[int, str] = {}
+    for node_id, class_id in partition.items():
+        current = representatives.get(class_id)
+        if current is None or node_id < current:
+            representatives[class_id] = node_id
+    mapping = {node_id: representatives[class_id]
+               for node_id, class_id in partition.items()}
+    with open(filepath, 'w') as f:
+        f.write(_dumps({'method': metadata.get('method'),
+                        'partition': mapping}))
 
 
 def main():
@@ -542,6 +671,12 @@ Examples:
     parser.add_argument('--preserve-queries', type=str, default='reachability',
                        help='Comma-separated query types to preserve')
     parser.add_argument('--output', '-o', help='Output file (default: input_compressed.json)')
+    parser.add_argument('--pretty', action='store_true',
+                       help='Indent the output JSON for human readers')
+    parser.add_argument('--keep-members', action='store_true',
+                       help='Embed full member lists in quotient node properties')
+    parser.add_argument('--emit-mapping', metavar='PATH',
+                       help='Write the node->class partition map to a sidecar JSON')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     
     args = parser.parse_args()
@@ -561,11 +696,13 @@ Examples:
         compressor = AutomorphismCompressor()
     
     # Compress
-    compressed, metadata = compressor.compress(graph)
-    
+    compressed, metadata = compressor.compress(graph, keep_members=args.keep_members)
+
     # Output
     output_path = args.output or args.input.replace('.json', '_compressed.json')
-    save_graph(compressed, metadata, output_path)
+    save_graph(compressed, metadata, output_path, pretty=args.pretty)
+    if args.emit_mapping:
+        save_partition(metadata, args.emit_mapping)
     
     # Report
     print(f"\nCompression Results ({metadata['method']}):")
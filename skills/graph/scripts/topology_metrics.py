@@ -21,11 +21,20 @@ Usage:
 
 import json
 import argparse
+import functools
 import math
-from collections import defaultdict
+from collections import deque
 from typing import Dict, List, Set, Tuple, Any, Optional
 from dataclasses import dataclass
 
+try:
+    # Rust-backed parser, ~5-10x faster than stdlib json for large graphs
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 @dataclass
 class TopologyReport:
@@ -97,11 +106,31 @@ class TopologyAnalyzer:
         """Initialize with graph JSON data."""
         self.nodes = {}
         self.edges = []
-        self.adjacency_out = defaultdict(list)  # node -> [(neighbor, edge_type)]
-        self.adjacency_in = defaultdict(list)
-        
+        # Plain dicts, read through .get(nid, ()): defaultdict indexing
+        # from the metric passes autovivified empty lists for every
+        # node touched, growing the adjacency maps as a side effect
+        self.adjacency_out = {}  # node -> [(neighbor, edge_type)]
+        self.adjacency_in = {}
+
         self._load_graph(graph_data)
-        
+
+        # Undirected neighbor sets, built once per graph. Clustering
+        # tests adjacency for every neighbor pair, and rebuilding these
+        # sets inside that O(k^2) loop thrashed memory on hub nodes.
+        ids = set(self.nodes) | set(self.adjacency_out) | set(self.adjacency_in)
+        self._undirected_neighbors: Dict[str, Set[str]] = {
+            node_id: {t for t, _ in self.adjacency_out.get(node_id, ())}
+                     | {s for s, _ in self.adjacency_in.get(node_id, ())}
+            for node_id in ids}
+
+        # One degree sweep shared by the distribution, isolation,
+        # fractal-dimension and coloring passes, which each re-derived
+        # the same lengths with their own full scan over the nodes
+        self._in_degrees: Dict[str, int] = {
+            nid: len(self.adjacency_in.get(nid, ())) for nid in self.nodes}
+        self._out_degrees: Dict[str, int] = {
+            nid: len(self.adjacency_out.get(nid, ())) for nid in self.nodes}
+
     def _load_graph(self, data: Dict[str, Any]):
         """Parse graph data from JSON."""
         graph = data.get('graph', data)
@@ -112,8 +141,10 @@ class TopologyAnalyzer:
             
         for edge in graph.get('edges', []):
             self.edges.append(edge)
-            self.adjacency_out[edge['source']].append((edge['target'], edge.get('type', 'related')))
-            self.adjacency_in[edge['target']].append((edge['source'], edge.get('type', 'related')))
+            self.adjacency_out.setdefault(edge['source'], []).append(
+                (edge['target'], edge.get('type', 'related')))
+            self.adjacency_in.setdefault(edge['target'], []).append(
+                (edge['source'], edge.get('type', 'related')))
     
     def compute_basic_metrics(self) -> Dict[str, Any]:
         """Compute fundamental graph metrics."""
@@ -136,15 +167,9 @@ class TopologyAnalyzer:
     
     def compute_degree_distribution(self) -> Dict[str, Any]:
         """Analyze degree distribution."""
-        in_degrees = []
-        out_degrees = []
-        
-        for node_id in self.nodes:
-            in_deg = len(self.adjacency_in[node_id])
-            out_deg = len(self.adjacency_out[node_id])
-            in_degrees.append(in_deg)
-            out_degrees.append(out_deg)
-        
+        in_degrees = list(self._in_degrees.values())
+        out_degrees = list(self._out_degrees.values())
+
         n = len(self.nodes)
         if n == 0:
             return {
@@ -157,11 +182,16 @@ class TopologyAnalyzer:
         
         avg_in = sum(in_degrees) / n
         avg_out = sum(out_degrees) / n
-        
-        # Variance of total degree
-        total_degrees = [i + o for i, o in zip(in_degrees, out_degrees)]
-        avg_total = sum(total_degrees) / n
-        variance = sum((d - avg_total) ** 2 for d in total_degrees) / n
+
+        # Variance of total degree in one pass: E[d^2] - E[d]^2 is exact
+        # here since degrees are small ints, so no two-pass correction
+        total = total_sq = 0
+        for i, o in zip(in_degrees, out_degrees):
+            d = i + o
+            total += d
+            total_sq += d * d
+        avg_total = total / n
+        variance = total_sq / n - avg_total * avg_total
         
         return {
             'avg_in_degree': round(avg_in, 4),
@@ -171,21 +201,16 @@ class TopologyAnalyzer:
             'degree_variance': round(variance, 4)
         }
     
+    @functools.cached_property
     def find_connected_components(self) -> Tuple[int, int, List[Set[str]]]:
         """Find weakly connected components."""
         visited = set()
         components = []
-        
-        # Build undirected adjacency for weak connectivity
-        undirected = defaultdict(set)
-        for node_id in self.nodes:
-            for neighbor, _ in self.adjacency_out[node_id]:
-                undirected[node_id].add(neighbor)
-                undirected[neighbor].add(node_id)
-            for neighbor, _ in self.adjacency_in[node_id]:
-                undirected[node_id].add(neighbor)
-                undirected[neighbor].add(node_id)
-        
+
+        # Weak connectivity walks the undirected neighbor sets already
+        # cached on the analyzer instead of rebuilding them per call
+        undirected = self._undirected_neighbors
+
         def dfs(start: str) -> Set[str]:
             component = set()
             stack = [start]
@@ -210,13 +235,12 @@ class TopologyAnalyzer:
     
     def compute_connectivity_metrics(self) -> Dict[str, Any]:
         """Analyze connectivity and isolation."""
-        num_components, largest_size, components = self.find_connected_components()
+        num_components, largest_size, components = self.find_connected_components
         
         # Isolated nodes (no edges)
-        isolated = 0
-        for node_id in self.nodes:
-            if not self.adjacency_out[node_id] and not self.adjacency_in[node_id]:
-                isolated += 1
+        isolated = sum(1 for node_id in self.nodes
+                       if not self._out_degrees[node_id]
+                       and not self._in_degrees[node_id])
         
         n = len(self.nodes)
         isolation_rate = isolated / n if n > 0 else 0
@@ -236,40 +260,41 @@ class TopologyAnalyzer:
         
         For directed graphs, we consider both in and out neighbors.
         """
-        # Get all neighbors (undirected view)
-        neighbors = set()
-        for neighbor, _ in self.adjacency_out[node_id]:
-            neighbors.add(neighbor)
-        for neighbor, _ in self.adjacency_in[node_id]:
-            neighbors.add(neighbor)
-        
+        und = self._undirected_neighbors
+        neighbors = und[node_id]
+
         k = len(neighbors)
         if k < 2:
             return 0.0
-        
-        # Count edges among neighbors
-        neighbor_edges = 0
-        neighbor_list = list(neighbors)
-        for i, n1 in enumerate(neighbor_list):
-            for n2 in neighbor_list[i+1:]:
-                # Check if edge exists in either direction
-                out_neighbors = {t for t, _ in self.adjacency_out[n1]}
-                in_neighbors = {s for s, _ in self.adjacency_in[n1]}
-                if n2 in out_neighbors or n2 in in_neighbors:
-                    neighbor_edges += 1
-        
+
+        # Count edges among neighbors via set intersection; each
+        # unordered pair is seen from both endpoints, and a neighbor's
+        # self-loop puts it in its own set, so discount both
+        neighbor_edges = sum(
+            len(neighbors & und[n1]) - (n1 in und[n1])
+            for n1 in neighbors) // 2
+
         # Possible edges among k neighbors
         possible = k * (k - 1) / 2
-        
+
         return neighbor_edges / possible if possible > 0 else 0.0
     
+    @functools.cached_property
     def compute_clustering_coefficient(self) -> float:
-        """Compute average clustering coefficient."""
+        """Compute average clustering coefficient.
+
+        Nodes with fewer than two neighbors have coefficient 0 by
+        definition and are skipped outright; they still count in the
+        denominator, so the average is unchanged. On power-law graphs
+        that is most of the nodes.
+        """
         if not self.nodes:
             return 0.0
-        
-        coefficients = [self.compute_local_clustering(nid) for nid in self.nodes]
-        return sum(coefficients) / len(coefficients)
+
+        und = self._undirected_neighbors
+        total = sum(self.compute_local_clustering(nid)
+                    for nid in self.nodes if len(und[nid]) >= 2)
+        return total / len(self.nodes)
     
     def compute_average_path_length(self, sample_size: int = 100) -> Optional[float]:
         """
@@ -300,7 +325,7 @@ class TopologyAnalyzer:
                 idx += 1
                 current_dist = distances[current]
                 
-                for neighbor, _ in self.adjacency_out[current]:
+                for neighbor, _ in self.adjacency_out.get(current, ()):
                     if neighbor not in distances:
                         distances[neighbor] = current_dist + 1
                         queue.append(neighbor)
@@ -313,6 +338,7 @@ class TopologyAnalyzer:
         
         return total_distance / pair_count if pair_count > 0 else None
     
+    @functools.cached_property
     def estimate_fractal_dimension(self) -> Optional[float]:
         """
         Estimate fractal dimension using box-covering approximation.
@@ -329,67 +355,72 @@ class TopologyAnalyzer:
         # (Scale-free networks have fractal properties)
         degrees = []
         for node_id in self.nodes:
-            deg = len(self.adjacency_out[node_id]) + len(self.adjacency_in[node_id])
+            deg = self._out_degrees[node_id] + self._in_degrees[node_id]
             if deg > 0:
                 degrees.append(deg)
         
         if len(degrees) < 5:
             return None
-        
-        degrees.sort(reverse=True)
-        
-        # Fit log-log slope (simplified power-law estimate)
-        log_ranks = [math.log(i + 1) for i in range(len(degrees))]
-        log_degrees = [math.log(d) for d in degrees]
-        
-        # Linear regression for slope
-        n = len(log_ranks)
-        sum_x = sum(log_ranks)
-        sum_y = sum(log_degrees)
-        sum_xy = sum(x * y for x, y in zip(log_ranks, log_degrees))
-        sum_xx = sum(x * x for x in log_ranks)
-        
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
-        
+
+        # Closed-form MLE for the power-law exponent (Clauset et al.,
+        # d_min = 1): gamma = 1 + n / sum(ln d). One pass over degrees,
+        # no sort or rank regression, and statistically sounder than
+        # fitting a log-log slope
+        log_sum = sum(math.log(d) for d in degrees)
+        if log_sum <= 0:
+            return None  # all degrees are 1; no power-law tail to fit
+
+        gamma = 1 + len(degrees) / log_sum
+
         # Fractal dimension related to degree exponent
         # d_B ≈ 1 / (gamma - 1) for scale-free networks
-        gamma = -slope
-        if gamma > 1:
-            d_B = 1 / (gamma - 1)
-            return min(round(d_B, 2), 10.0)  # Cap at 10
-        
-        return None
+        d_B = 1 / (gamma - 1)
+        return min(round(d_B, 2), 10.0)  # Cap at 10
     
+    @functools.cached_property
     def compute_hierarchy_depth(self) -> int:
         """
         Estimate hierarchy depth from longest path in DAG component.
         
         For knowledge graphs with type hierarchies, this indicates
         abstraction levels.
+
+        One Kahn topological sweep computes the longest root-to-node
+        path in O(V+E). The previous per-root DFS re-walked shared
+        descendants once per root and, worse, skipped nodes already
+        visited from a shallower root, undercounting the depth.
         """
+        # In-degrees over every ID the edges mention, not just declared
+        # nodes, so paths through undeclared endpoints still count
+        indeg = dict(self._in_degrees)
+        for node_id, incoming in self.adjacency_in.items():
+            if node_id not in indeg:
+                indeg[node_id] = len(incoming)
+        for node_id in self.adjacency_out:
+            indeg.setdefault(node_id, 0)
+
+        queue = deque(nid for nid, deg in indeg.items() if deg == 0)
+        depth = {nid: 1 for nid in queue}
         max_depth = 0
-        
-        # Find nodes with no incoming edges (roots)
-        roots = [nid for nid in self.nodes if not self.adjacency_in[nid]]
-        
-        for root in roots:
-            # DFS with depth tracking
-            stack = [(root, 1)]
-            visited = set()
-            
-            while stack:
-                node, depth = stack.pop()
-                if node in visited:
-                    continue
-                visited.add(node)
-                max_depth = max(max_depth, depth)
-                
-                for neighbor, _ in self.adjacency_out[node]:
-                    if neighbor not in visited:
-                        stack.append((neighbor, depth + 1))
-        
+
+        while queue:
+            node = queue.popleft()
+            node_depth = depth[node]
+            if node_depth > max_depth:
+                max_depth = node_depth
+            next_depth = node_depth + 1
+            for neighbor, _ in self.adjacency_out.get(node, ()):
+                if depth.get(neighbor, 0) < next_depth:
+                    depth[neighbor] = next_depth
+                indeg[neighbor] -= 1
+                if indeg[neighbor] == 0:
+                    queue.append(neighbor)
+
+        # Nodes left on a cycle never reach in-degree 0 and contribute
+        # no depth, matching the DAG framing of this metric
         return max_depth
     
+    @functools.cached_property
     def estimate_compression_potential(self) -> Tuple[int, float]:
         """
         Estimate compression potential via color-refinement based orbit approximation.
@@ -400,32 +431,39 @@ class TopologyAnalyzer:
         if not self.nodes:
             return 0, 0.0
         
-        # Initial coloring: node type + degree
+        # Initial coloring: node type + degree, interned to small ints
+        # so refinement hashes tuples of ints instead of growing strings
+        color_map: Dict[Tuple, int] = {}
         coloring = {}
         for node_id, node in self.nodes.items():
-            in_deg = len(self.adjacency_in[node_id])
-            out_deg = len(self.adjacency_out[node_id])
-            node_type = node.get('type', 'entity')
-            coloring[node_id] = f"{node_type}|{in_deg}|{out_deg}"
-        
+            key = (node.get('type', 'entity'),
+                   self._in_degrees[node_id], self._out_degrees[node_id])
+            coloring[node_id] = color_map.setdefault(key, len(color_map))
+        num_colors = len(color_map)
+
         # Refine coloring
         for _ in range(3):  # Limited iterations for efficiency
+            sig_map: Dict[Tuple, int] = {}
             new_coloring = {}
             for node_id in self.nodes:
                 neighbor_colors = []
-                for neighbor, edge_type in self.adjacency_out[node_id]:
-                    neighbor_colors.append(f"o:{edge_type}:{coloring[neighbor]}")
-                for neighbor, edge_type in self.adjacency_in[node_id]:
-                    neighbor_colors.append(f"i:{edge_type}:{coloring[neighbor]}")
+                for neighbor, edge_type in self.adjacency_out.get(node_id, ()):
+                    neighbor_colors.append((0, edge_type, coloring[neighbor]))
+                for neighbor, edge_type in self.adjacency_in.get(node_id, ()):
+                    neighbor_colors.append((1, edge_type, coloring[neighbor]))
                 neighbor_colors.sort()
-                new_coloring[node_id] = f"{coloring[node_id]}|{'|'.join(neighbor_colors)}"
-            
-            if new_coloring == coloring:
+                sig = (coloring[node_id], tuple(neighbor_colors))
+                new_coloring[node_id] = sig_map.setdefault(sig, len(sig_map))
+
+            # Refinement only splits color classes: an unchanged count
+            # means the partition is stable
+            if len(sig_map) == num_colors:
                 break
+            num_colors = len(sig_map)
             coloring = new_coloring
-        
+
         # Count distinct colors (approximate orbits)
-        num_orbits = len(set(coloring.values()))
+        num_orbits = num_colors
         n = len(self.nodes)
         
         compression_potential = 1 - (num_orbits / n) if n > 0 else 0
@@ -505,11 +543,11 @@ class TopologyAnalyzer:
         basic = self.compute_basic_metrics()
         degrees = self.compute_degree_distribution()
         connectivity = self.compute_connectivity_metrics()
-        clustering = self.compute_clustering_coefficient()
+        clustering = self.compute_clustering_coefficient
         path_length = self.compute_average_path_length()
-        fractal_dim = self.estimate_fractal_dimension()
-        hierarchy = self.compute_hierarchy_depth()
-        orbits, compression = self.estimate_compression_potential()
+        fractal_dim = self.estimate_fractal_dimension
+        hierarchy = self.compute_hierarchy_depth
+        orbits, compression = self.estimate_compression_potential
         
         # Combine all metrics
         all_metrics = {
@@ -632,12 +670,31 @@ Examples:
     
     args = parser.parse_args()
     
-    with open(args.input) as f:
-        data = json.load(f)
+    with open(args.input, 'rb') as f:
+        data = _loads(f.read())
     
     analyzer = TopologyAnalyzer(data)
+
+    if args.compression_potential:
+        # Only the WL pass runs; APSP sampling, clustering and the rest
+        # stay untouched behind their cached properties
+        orbits, potential = analyzer.estimate_compression_potential
+        summary = {
+            'num_nodes': len(analyzer.nodes),
+            'estimated_orbits': orbits,
+            'compression_potential': potential
+        }
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print("COMPRESSION POTENTIAL")
+            print(f"  Nodes: {summary['num_nodes']}")
+            print(f"  Estimated Orbits: {orbits}")
+            print(f"  Compression Potential: {potential*100:.1f}%")
+        return
+
     report = analyzer.analyze()
-    
+
     if args.json:
         import dataclasses
         print(json.dumps(dataclasses.asdict(report), indent=2))
@@ -52,6 +52,13 @@ def load_graph(filepath: str) -> Tuple[Dict[str, Any], List[Any], Dict[str, int]
     return nodes, edges, partition
 
 
+def load_partition(filepath: str) -> Dict[str, str]:
+    """Load a node -> class mapping from a compress_graph.py sidecar JSON."""
+    with open(filepath) as f:
+        data = json.load(f)
+    return data.get('partition', data)
+
+
 def build_adjacency(nodes: Dict[str, Any], edges: List[Any]) -> Dict[str, Set[str]]:
     """Build adjacency list."""
     adj = defaultdict(set)
@@ -92,38 +99,44 @@ def verify_reachability(original_nodes: Dict, original_edges: List,
         a, b = random.sample(node_list, 2)
         pairs.append((a, b))
     
-    # BFS reachability check
-    def can_reach(adj: Dict[str, Set[str]], source: str, target: str) -> bool:
-        if source == target:
-            return True
+    # One BFS per distinct source yields its full reachable set, so
+    # every pair sharing that source is a set lookup instead of a fresh
+    # traversal; sampled pairs repeat sources often enough that this
+    # replaces up to 2*sample_size BFS runs with a handful
+    def reachable_from(adj: Dict[str, Set[str]], source: str) -> Set[str]:
         visited = {source}
         queue = deque([source])
         while queue:
             current = queue.popleft()
-            for neighbor in adj[current]:
-                if neighbor == target:
-                    return True
+            for neighbor in adj.get(current, ()):
                 if neighbor not in visited:
                     visited.add(neighbor)
                     queue.append(neighbor)
-        return False
-    
+        return visited
+
+    orig_reach: Dict[str, Set[str]] = {}
+    comp_reach: Dict[str, Set[str]] = {}
+
     preserved = 0
     violated = 0
     violations = []
-    
+
     for a, b in pairs:
-        orig_reachable = can_reach(orig_adj, a, b)
-        
+        if a not in orig_reach:
+            orig_reach[a] = reachable_from(orig_adj, a)
+        orig_reachable = b in orig_reach[a]
+
         # Map to compressed representatives
         a_rep = partition.get(a, a)
         b_rep = partition.get(b, b)
-        
+
         # If both map to same representative, trivially reachable
         if a_rep == b_rep:
             comp_reachable = True
         elif a_rep in compressed_nodes and b_rep in compressed_nodes:
-            comp_reachable = can_reach(comp_adj, a_rep, b_rep)
+            if a_rep not in comp_reach:
+                comp_reach[a_rep] = reachable_from(comp_adj, a_rep)
+            comp_reachable = b_rep in comp_reach[a_rep]
         else:
             comp_reachable = False
         
@@ -266,6 +279,9 @@ Examples:
     parser.add_argument('--queries', default='reachability,pattern,neighborhood',
                        help='Query types to verify (comma-separated)')
     parser.add_argument('--k', type=int, default=3, help='Neighborhood depth for neighborhood queries')
+    parser.add_argument('--mapping', metavar='PATH',
+                       help='Sidecar JSON with the node->class partition map '
+                            '(written by compress_graph.py --emit-mapping)')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
     
     args = parser.parse_args()
@@ -273,7 +289,12 @@ Examples:
     # Load graphs
     orig_nodes, orig_edges, _ = load_graph(args.original)
     comp_nodes, comp_edges, partition = load_graph(args.compressed)
-    
+
+    # A sidecar mapping takes precedence over anything embedded in the
+    # compressed file
+    if args.mapping:
+        partition = load_partition(args.mapping)
+
     # If partition not in compressed, try to reconstruct
     if not partition:
         # Assume identity partition for comparison